@@ -1,34 +1,36 @@
 from __future__ import annotations
 
 import asyncio
+from collections import Counter
+import io
 from contextlib import asynccontextmanager
 import contextlib
-import copy
 from dataclasses import dataclass
+import functools
 from functools import cached_property
 import re
+import time
 import typing
-from typing import Callable, Optional, Union, Literal, List, Dict, Tuple
+import weakref
+from typing import Callable, Iterable, Optional, Set, Union, Literal, List, Dict, Tuple
 
+import asyncpg
 import emoji
 import numpy as np
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 from helpers.context import CustomContext
-from pilmoji import Pilmoji
 
 from helpers.utils import (
     emoji_to_option_dict,
     force_log_errors,
-    image_to_file,
     reload_modules,
     value_to_option_dict,
 )
 from helpers.constants import EMBED_DESC_CHAR_LIMIT, EMBED_FIELD_CHAR_LIMIT, u200b, NL
 from .utils.constants import (
-    FONT,
     ROW_ICONS_DICT,
     ROW_ICONS,
     COLUMN_ICONS_DICT,
@@ -43,12 +45,30 @@ from .utils.constants import (
     base_colour_options,
     base_number_options,
     MIN_HEIGHT_OR_WIDTH,
-    MAX_HEIGHT_OR_WIDTH,
+    MAX_CANVAS_SIZE,
+    VIEWPORT_SIZE,
+    VIEWPORT_TEXT_PREFIX,
     SAVE_FILENAME,
+    SAVE_MAX_SIZE,
+    EMOJI_SIZE,
+    HISTORY_MAX_BYTES,
+    EDIT_COALESCE_DELAY,
+    BOARD_STATE_URL,
+    EMBED_URL_LIMIT,
+    TIMELAPSE_FILENAME,
+    TIMELAPSE_MAX_SIZE,
+    TIMELAPSE_TILE_SIZE,
+    DEFAULT_FILESIZE_LIMIT,
+    PREVIEW_FILENAME,
+    IMPORT_DEFAULT_COLOURS,
+    IMPORT_MAX_COLOURS,
+    IMPORT_MAX_BYTES,
 )
 from .utils.emoji import (
     ADD_EMOJIS_EMOJI,
     SAVE_EMOJI,
+    TIMELAPSE_EMOJI,
+    PREVIEW_EMOJI,
     SET_CURSOR_EMOJI,
     ADD_COLOURS_EMOJI,
     MIX_COLOURS_EMOJI,
@@ -57,12 +77,23 @@ from .utils.emoji import (
     SentEmoji,
     AddedEmoji,
 )
+from .utils.palette import Palette, PIXEL_DTYPE
+from .utils.history import History
+from .utils.atlas import TILE_ATLAS, fit_size, render_board
+from .utils.renderer import RENDERER
+from .utils.timelapse import render_timelapse
+from .utils.preview import BoardPreview
+from .utils.quantize import quantize_image
+from .utils.colour_analysis import COLOUR_ANALYZER
+from .utils.snapping import SNAP_MODES, SnapMode
+from .utils.emoji_store import EMOJI_STORE
 from .utils.tools import (
     Tool,
     BrushTool,
     EraseTool,
     EyedropperTool,
     FillTool,
+    DiagonalFillTool,
     ReplaceTool,
     DarkenTool,
     LightenTool,
@@ -73,7 +104,15 @@ from .utils.regexes import (
     RGB_A_REGEX,
     CUSTOM_EMOJI_REGEX,
 )
-from .utils.errors import InvalidDrawMessageError
+from .utils.errors import (
+    BoardEncodingError,
+    InvalidDrawMessageError,
+    TimelapseTooLargeError,
+    ImageTooLargeError,
+    RenderError,
+)
+from .utils.encoding import decode_board, decode_history, encode_board, pack_history
+from .utils.sessions import Session
 from .utils.colour import Colour
 
 if typing.TYPE_CHECKING:
@@ -90,12 +129,11 @@ class Coords:
         self.iy: int = self.y * -1
 
 
-TRANSPARENT_ERROR_MSG = (
-    "Sorry, embed description character limit reached. "
-    "This is most likely because the `transparent` background "
-    "uses custom emojis which are 20+ characters long each. "
-    "Please instead try one of the other background options "
-    "that is a unicode/default emoji (such as `⬜`) or a smaller board."
+IMAGE_MODE_MSG = (
+    "This board is too long to be shown with emojis in an embed, "
+    "since custom emojis (such as colour emojis and the `transparent` "
+    "background) are 20+ characters long each. "
+    "It will be shown as an image instead once you create it."
 )
 
 
@@ -107,6 +145,7 @@ class StartView(discord.ui.View):
         board: Union[Board, Tuple[int, int, str]],
         tool_options: Optional[List[discord.SelectOption]] = None,
         colour_options: Optional[List[discord.SelectOption]] = None,
+        snapping: Optional[SnapMode] = "off",
     ):
         super().__init__(timeout=60)
         self.ctx = ctx
@@ -122,6 +161,7 @@ class StartView(discord.ui.View):
 
         self.tool_options = tool_options
         self.colour_options = colour_options
+        self.snapping: SnapMode = snapping
 
         self.update_buttons()
 
@@ -162,10 +202,13 @@ class StartView(discord.ui.View):
         await self.response.edit(view=None)
         self.stop()
 
+    @property
+    def description(self) -> str:
+        board = str(self.board)
+        return board if len(board) <= EMBED_DESC_CHAR_LIMIT else IMAGE_MODE_MSG
+
     async def start(self):
-        if len(str(self.board)) > EMBED_DESC_CHAR_LIMIT:
-            return await self.ctx.send(TRANSPARENT_ERROR_MSG)
-        embed = self.bot.Embed(description=str(self.board))
+        embed = self.bot.Embed(description=self.description)
         embed.set_footer(
             text="Custom emojis may not appear here due to a discord limitation, but will render once you create the board."
         )
@@ -186,17 +229,13 @@ class StartView(discord.ui.View):
         self.set_default(self.background_select, self.background)
         self.set_default(self.height_select, self.height)
         self.set_default(self.width_select, self.width)
+        self.set_default(self.snapping_select, self.snapping)
 
     async def update(self, interaction: discord.Interaction):
-        if len(str(self.board)) > EMBED_DESC_CHAR_LIMIT:
-            self.height = 9
-            self.width = 9
-            await interaction.followup.send(TRANSPARENT_ERROR_MSG, ephemeral=True)
-
         self.update_buttons()
         await interaction.edit_original_response(
             content=self.initial_message,
-            embed=self.bot.Embed(description=str(self.board)),
+            embed=self.bot.Embed(description=self.description),
             view=self,
         )
 
@@ -233,6 +272,25 @@ class StartView(discord.ui.View):
         self.width = int(select.values[0])
         await self.update(interaction)
 
+    @discord.ui.select(
+        options=[
+            discord.SelectOption(
+                label=f"Colour snapping: {mode}", value=mode, description=description
+            )
+            for mode, description in SNAP_MODES.items()
+        ],
+        placeholder="Colour snapping",
+    )
+    async def snapping_select(
+        self, interaction: discord.Interaction, select: discord.ui.Select
+    ):
+        await interaction.response.defer()
+
+        if self.snapping == select.values[0]:
+            return
+        self.snapping = select.values[0]
+        await self.update(interaction)
+
     async def send_message(
         self, interaction: discord.Interaction, *, draw_view: DrawView
     ) -> discord.WebhookMessage:
@@ -279,12 +337,13 @@ class StartView(discord.ui.View):
             ctx=self.ctx,
             tool_options=self.tool_options,
             colour_options=self.colour_options,
+            snapping=self.snapping,
         )
         response = await self.send_message(interaction, draw_view=draw_view)
         draw_view.response = response
-        await response.edit(
-            embed=draw_view.embed, view=draw_view
-        )  # This is necessary because custom emojis only render when a followup is edited ◉_◉
+        # This is necessary because custom emojis only render when a followup is edited ◉_◉
+        # It also attaches the preview, if the board is shown as one
+        await draw_view.edit_message()
         await self.response.delete()
         self.stop()
 
@@ -322,6 +381,7 @@ class Notification:
         else:
             emoji = self.emoji
         self.content = content
+        self.view.invalidate_notifications()
 
         if interaction is not None:
             await self.view.edit_message(interaction)
@@ -335,7 +395,6 @@ class Notification:
 
 
 TRANSPARENT_KEY = "transparent"
-EMOJI_SIZE = 128
 
 
 class Board:
@@ -347,6 +406,7 @@ class Board:
         background: Optional[
             Literal["🟥", "🟧", "🟨", "🟩", "🟦", "🟪", "🟫", "⬛", "⬜", "transparent"]
         ] = "⬜",
+        history_limit: int = HISTORY_MAX_BYTES,
     ) -> None:
         self.height: int = height
         self.width: int = width
@@ -354,12 +414,26 @@ class Board:
             TRANSPARENT_EMOJI if background == TRANSPARENT_KEY else background
         )
 
+        # Large boards get a proportionally larger history budget, so that
+        # steps over the whole canvas can still be undone more than once
+        history_limit *= -(-self.height * self.width // VIEWPORT_SIZE**2)
+
+        self.palette: Palette = Palette([self.background])
         self.initial_board: np.ndarray = np.full(
-            (self.height, self.width), self.background, dtype="object"
+            (self.height, self.width),
+            self.palette.index(self.background),
+            dtype=PIXEL_DTYPE,
         )
-        self.board_history: List[np.ndarray] = [self.initial_board.copy()]
-        self.board_index: int = 0
+        self.history: History = History(self.initial_board, max_bytes=history_limit)
+        # Palette indices drawn with since they were last collected, to track emoji usage
+        self.drawn: Set[int] = set()
+        # Incremented whenever the pixels change
+        self.version: int = 0
+        # The state URL of the board, and the version and background it was encoded at
+        self._state_url: Tuple[Optional[Tuple], Optional[str]] = (None, None)
+        self.preview: BoardPreview = BoardPreview()
         self.set_attributes()
+        self.invalidate()
 
         # This is for select tool.
         self.initial_coords: Tuple[int, int]
@@ -368,25 +442,58 @@ class Board:
         self.clear_cursors()
 
     def set_attributes(self):
-        self.row_labels: Tuple[str] = ROW_ICONS[: self.height]
-        self.col_labels: Tuple[str] = COLUMN_ICONS[: self.width]
-        self.centre: Tuple[int, int] = (
-            len(self.row_labels) // 2,
-            len(self.col_labels) // 2,
-        )
+        # Only a viewport of the board is shown in the embed, the
+        # row/col labels are those of the viewport and not the board
+        self.view_height: int = min(self.height, VIEWPORT_SIZE)
+        self.view_width: int = min(self.width, VIEWPORT_SIZE)
+        self.row_labels: Tuple[str] = ROW_ICONS[: self.view_height]
+        self.col_labels: Tuple[str] = COLUMN_ICONS[: self.view_width]
+        self.centre: Tuple[int, int] = (self.height // 2, self.width // 2)
         self.centre_row, self.centre_col = self.centre
 
         self.cursor: str = self.background
         self.cursor_row, self.cursor_col = self.centre
-        self.cursor_row_max = len(self.row_labels) - 1
-        self.cursor_col_max = len(self.col_labels) - 1
-        self.cursor_coords: List[Tuple[int, int]] = [(self.cursor_row, self.cursor_col)]
+        self.cursor_row_max = self.height - 1
+        self.cursor_col_max = self.width - 1
+        # Top left cell of the viewport, which starts centred on the cursor
+        self.view_row: int = min(
+            max(self.cursor_row - self.view_height // 2, 0),
+            self.height - self.view_height,
+        )
+        self.view_col: int = min(
+            max(self.cursor_col - self.view_width // 2, 0),
+            self.width - self.view_width,
+        )
+        # The cursors are kept separate from the pixels, as the bounds
+        # (row_start, row_stop, col_start, col_stop) of the selected rectangle.
+        # They are only combined with the pixels when the board is rendered.
+        self.cursor_bounds: Optional[Tuple[int, int, int, int]] = (
+            self.cursor_row,
+            self.cursor_row + 1,
+            self.cursor_col,
+            self.cursor_col + 1,
+        )
 
     def __str__(self) -> str:
         """Method that gives a formatted version of the board with row/col labels"""
 
-        cursor_rows = tuple(row for row, col in self.cursor_coords)
-        cursor_cols = tuple(col for row, col in self.cursor_coords)
+        return self.format()
+
+    def format(self, *, cursors: Optional[bool] = False) -> str:
+        """Method that gives a formatted version of the viewport of the board with
+        row/col labels, optionally rendering the cursors on top of the pixels"""
+
+        view = self.board[self.viewport_slice]
+        pixels = self.palette.to_emojis(view)
+        cursor_rows = self.view_cursor_rows
+        cursor_cols = self.view_cursor_cols
+        if cursors is True:
+            cursor_slice = (
+                slice(cursor_rows.start, cursor_rows.stop),
+                slice(cursor_cols.start, cursor_cols.stop),
+            )
+            pixels[cursor_slice] = self.palette.to_cursor_emojis(view[cursor_slice])
+
         row_labels = [
             (row if idx not in cursor_rows else ROW_ICONS_DICT[row])
             for idx, row in enumerate(self.row_labels)
@@ -398,27 +505,241 @@ class Board:
 
         return (
             f"{self.cursor}{PADDING}{u200b.join(col_labels)}\n"
-            f"\n{NL.join([f'{row_labels[idx]}{PADDING}{u200b.join(row)}' for idx, row in enumerate(self.board)])}"
+            f"\n{NL.join([f'{row_labels[idx]}{PADDING}{u200b.join(row)}' for idx, row in enumerate(pixels)])}"
+        )
+
+    @property
+    def cursor_rows(self) -> range:
+        if self.cursor_bounds is None:
+            return range(0)
+        return range(self.cursor_bounds[0], self.cursor_bounds[1])
+
+    @property
+    def cursor_cols(self) -> range:
+        if self.cursor_bounds is None:
+            return range(0)
+        return range(self.cursor_bounds[2], self.cursor_bounds[3])
+
+    @property
+    def view_cursor_rows(self) -> range:
+        """The rows under the cursors that are in the viewport, relative to it"""
+
+        rows = self.cursor_rows
+        return range(
+            max(rows.start - self.view_row, 0),
+            max(min(rows.stop - self.view_row, self.view_height), 0),
+        )
+
+    @property
+    def view_cursor_cols(self) -> range:
+        """The columns under the cursors that are in the viewport, relative to it"""
+
+        cols = self.cursor_cols
+        return range(
+            max(cols.start - self.view_col, 0),
+            max(min(cols.stop - self.view_col, self.view_width), 0),
+        )
+
+    @property
+    def paged(self) -> bool:
+        """Whether the board is larger than its viewport"""
+
+        return self.height > self.view_height or self.width > self.view_width
+
+    @property
+    def viewport_slice(self) -> Tuple[slice, slice]:
+        """Index of the pixel array that selects the cells in the viewport"""
+
+        return (
+            slice(self.view_row, self.view_row + self.view_height),
+            slice(self.view_col, self.view_col + self.view_width),
+        )
+
+    @property
+    def viewport_text(self) -> str:
+        return (
+            f"{VIEWPORT_TEXT_PREFIX} rows {self.view_row}-{self.view_row + self.view_height - 1} and "
+            f"columns {self.view_col}-{self.view_col + self.view_width - 1} "
+            f"of the {self.height}x{self.width} board."
+        )
+
+    @property
+    def cursor_text(self) -> str:
+        """Where the cursors are, for when the board is shown as an image"""
+
+        if self.cursor_bounds is None:
+            return f"{self.cursor}"
+
+        rows, cols = self.cursor_rows, self.cursor_cols
+        if len(rows) == len(cols) == 1:
+            return f"{self.cursor} Cursor at row {rows.start}, column {cols.start}"
+        return (
+            f"{self.cursor} Selected rows {rows.start}-{rows.stop - 1}, "
+            f"columns {cols.start}-{cols.stop - 1}"
+        )
+
+    async def preview_png(self) -> bytes:
+        """PNG image of the whole board with the cursors drawn on top, see utils/preview.py"""
+
+        return await self.preview.render(
+            self.board, self.palette.emojis, self.cursor_bounds, version=self.version
+        )
+
+    def scroll(self, row: int, col: int) -> bool:
+        """Moves the top left of the viewport to (row, col), clamped to the board.
+        Returns whether the viewport moved."""
+
+        row = min(max(row, 0), self.height - self.view_height)
+        col = min(max(col, 0), self.width - self.view_width)
+        if (row, col) == (self.view_row, self.view_col):
+            return False
+
+        if col != self.view_col:
+            self.invalidate()
+        else:
+            # The rows still in the viewport are rendered the same, so keep them
+            self._rendered_rows = {
+                r: rendered
+                for r, rendered in self._rendered_rows.items()
+                if row <= r < row + self.view_height
+            }
+        self.view_row, self.view_col = row, col
+        return True
+
+    def scroll_to_cursor(self) -> bool:
+        """Scrolls the viewport as little as possible for the cursor to be in it"""
+
+        return self.scroll(
+            min(max(self.view_row, self.cursor_row - self.view_height + 1), self.cursor_row),
+            min(max(self.view_col, self.cursor_col - self.view_width + 1), self.cursor_col),
+        )
+
+    @property
+    def cursor_slice(self) -> Tuple[slice, slice]:
+        """Index of the pixel array that selects the cells under the cursors"""
+
+        rows, cols = self.cursor_rows, self.cursor_cols
+        return slice(rows.start, rows.stop), slice(cols.start, cols.stop)
+
+    @property
+    def cursor_mask(self) -> np.ndarray:
+        mask = np.zeros(self.board.shape, dtype=bool)
+        mask[self.cursor_slice] = True
+        return mask
+
+    @property
+    def cursor_coords(self) -> np.ndarray:
+        """The (row, col) pairs of the cells under the cursors"""
+
+        return np.argwhere(self.cursor_mask)
+
+    def invalidate(self, rows: Optional[Iterable[int]] = None):
+        """Marks rows (or all rows if None) to be re-rendered on the next render"""
+
+        if rows is None:
+            self.version += 1
+            # Rendered rows of the viewport, by their row on the board
+            self._rendered_rows: Dict[int, str] = {}
+            self._rendered_bounds: Optional[Tuple[int, int, int, int]] = None
+            self._rendered_header: Tuple[Optional[Tuple], str] = (None, "")
+            return
+
+        for row in rows:
+            self._rendered_rows.pop(row, None)
+
+    def invalidate_cells(self, cells: Optional[np.ndarray]):
+        """Marks the rows of flat cell indices returned by the history as dirty"""
+
+        if cells is not None:
+            self.version += 1
+            self.invalidate(np.unique(cells // self.width))
+
+    def render_row(self, row: int) -> str:
+        """Renders the cells of a row of the board that are in the viewport, without its label,
+        which changes with the viewport"""
+
+        view = self.board[row, self.viewport_slice[1]]
+        pixels = self.palette.to_emojis(view)
+
+        if row in self.cursor_rows:
+            cols = self.view_cursor_cols
+            cols = slice(cols.start, cols.stop)
+            pixels[cols] = self.palette.to_cursor_emojis(view[cols])
+        return u200b.join(pixels)
+
+    def row_label(self, row: int) -> str:
+        label = self.row_labels[row - self.view_row]
+        return ROW_ICONS_DICT[label] if row in self.cursor_rows else label
+
+    def render(self) -> str:
+        """Method that gives the same output as format(cursors=True), but only re-renders
+        the rows of the viewport that were drawn on or had their cursors changed since
+        the last render, so its cost does not grow with the size of the board"""
+
+        if self.cursor_bounds != self._rendered_bounds:
+            # Only the rows under the previous and current cursors need to be re-rendered
+            rendered_rows = (
+                range(self._rendered_bounds[0], self._rendered_bounds[1])
+                if self._rendered_bounds is not None
+                else range(0)
+            )
+            self.invalidate(rendered_rows)
+            self.invalidate(self.cursor_rows)
+            self._rendered_bounds = self.cursor_bounds
+
+        rows = range(self.view_row, self.view_row + self.view_height)
+        for row in rows:
+            if row not in self._rendered_rows:
+                self._rendered_rows[row] = self.render_row(row)
+
+        cursor_cols = self.view_cursor_cols
+        header_key = (self.cursor, cursor_cols)
+        if self._rendered_header[0] != header_key:
+            col_labels = [
+                (col if idx not in cursor_cols else COLUMN_ICONS_DICT[col])
+                for idx, col in enumerate(self.col_labels)
+            ]
+            self._rendered_header = (
+                header_key,
+                f"{self.cursor}{PADDING}{u200b.join(col_labels)}\n",
+            )
+
+        return f"{self._rendered_header[1]}\n" + NL.join(
+            f"{self.row_label(row)}{PADDING}{self._rendered_rows[row]}" for row in rows
         )
 
     @property
     def str(self) -> str:
         """Method that gives a formatted version of the board without row/col labels"""
 
-        return f"{NL.join([f'{u200b.join(row)}' for row in self.board])}"
+        return f"{NL.join([f'{u200b.join(row)}' for row in self.pixels])}"
 
     @property
-    def board(self) -> np.ndarray:
-        return self.board_history[self.board_index]
+    def pixels(self) -> np.ndarray:
+        """The board as an array of emoji strings"""
 
-    @board.setter
-    def board(self, board: np.ndarray):
-        self.board_history.append(board)
-        self.board_index += 1
+        return self.palette.to_emojis(self.board)
 
     @property
-    def backup_board(self) -> np.ndarray:
-        return self.board_history[self.board_index - 1]
+    def board(self) -> np.ndarray:
+        return self.history.current
+
+    def undo(self) -> bool:
+        cells = self.history.undo()
+        self.invalidate_cells(cells)
+        return cells is not None
+
+    def redo(self) -> bool:
+        cells = self.history.redo()
+        self.invalidate_cells(cells)
+        return cells is not None
+
+    def pop(self) -> bool:
+        """Reverts the last step and removes it from the history"""
+
+        cells = self.history.pop()
+        self.invalidate_cells(cells)
+        return cells is not None
 
     def modify(
         self,
@@ -438,8 +759,9 @@ class Board:
         ):  # Return if none of the attributes have been changed
             return self
 
+        palette = self.palette.copy()
         overlay = self.board
-        base = np.full((height, width), background, dtype="object")
+        base = np.full((height, width), palette.index(background), dtype=PIXEL_DTYPE)
 
         # Coordinates of the centre of the overlay board
         overlay_centre = Coords(overlay.shape[1] // 2, overlay.shape[0] // 2)
@@ -485,31 +807,38 @@ class Board:
             base_overlay_from.y : base_overlay_to.y,
             base_overlay_from.x : base_overlay_to.x,
         ] = overlay
-        return Board.from_board(base, background=background)
+        return Board.from_board(base, palette=palette, background=background)
 
     @property
-    def cursor_pixel(self):
-        return self.un_cursor(self.board[self.cursor_row, self.cursor_col])
+    def cursor_pixel(self) -> str:
+        return self.get_pixel()
 
     @cursor_pixel.setter
     def cursor_pixel(self, value: str):
         if not isinstance(value, str):
             raise TypeError("Value must be a string")
-        self.board[self.cursor_row, self.cursor_col] = value
+        self.draw(value, coords=[(self.cursor_row, self.cursor_col)])
 
     def get_pixel(
         self,
         row: Optional[int] = None,
         col: Optional[int] = None,
-    ):
+    ) -> str:
+        return self.palette[self.get_pixel_index(row, col)]
+
+    def get_pixel_index(
+        self,
+        row: Optional[int] = None,
+        col: Optional[int] = None,
+    ) -> int:
         row = row if row is not None else self.cursor_row
         col = col if col is not None else self.cursor_col
 
-        return self.un_cursor(self.board[row, col])
+        return int(self.board[row, col])
 
     def clear(self):
         self.draw(
-            self.background, coords=np.array(np.where(self.board != self.background)).T
+            self.background, coords=self.board != self.palette.index(self.background)
         )
         self.clear_cursors()
 
@@ -518,64 +847,62 @@ class Board:
 
     def draw(
         self,
-        colour: Optional[str] = None,
+        colour: Optional[Union[str, List[str]]] = None,
         *,
-        coords: Optional[List[Tuple[int, int]]] = None,
+        coords: Optional[Union[List[Tuple[int, int]], np.ndarray]] = None,
     ) -> bool:
-        colour = colour or self.cursor
-        coords = coords if coords is not None else self.cursor_coords
+        """Draws a colour on the cells at coords, which is either a sequence of (row, col)
+        pairs or a boolean mask of the board's shape. Returns whether anything changed.
 
-        colour_emoji = discord.PartialEmoji.from_str(colour)
-        colour_pixel = (
-            colour_emoji.id if colour_emoji.is_custom_emoji() else colour_emoji.name
-        )
+        The colour can also be a list of colours, one for each of the cells in order,
+        to draw different colours in a single step."""
+
+        colour = colour or self.cursor
+        coords = coords if coords is not None else self.cursor_mask
 
-        cursor_matches = []
-        for row, col in coords:
-            board_emoji = discord.PartialEmoji.from_str(self.board[row, col])
-            board_pixel = (
-                board_emoji.id if board_emoji.is_custom_emoji() else board_emoji.name
+        if isinstance(colour, str):
+            colour_index = self.palette.index(colour)
+        else:
+            colour_index = np.array(
+                [self.palette.index(c) for c in colour], dtype=PIXEL_DTYPE
             )
-            if board_pixel == colour_pixel:
-                cursor_matches.append(True)
-            else:
-                cursor_matches.append(False)
-        if all(cursor_matches):
-            return False
+        cells = self.cells(coords)
 
-        colour_emoji = discord.PartialEmoji.from_str(colour)
-        if colour_emoji.is_custom_emoji():
-            colour_emoji.name = "e"
-        colour = str(colour_emoji)
-
-        self.board_history = self.board_history[: self.board_index + 1]
-        self.board = self.board.copy()
-
-        for row, col in coords:
-            self.board[row, col] = colour
-
-        # 3am debug statement
-        # print(
-        #     "\n-------------------------\n".join(
-        #         [
-        #             NEW_LINE.join([f'{"".join(row)}' for row in board])
-        #             for board in self.history
-        #         ]
-        #     ),
-        #     f"-------{len(self.history)}-------",
-        #     sep="\n",
-        # )
+        changed = self.history.push(cells, colour_index)
+        self.invalidate_cells(changed)
+        if changed is not None:
+            self.drawn.update(np.unique(colour_index).tolist())
+        return changed is not None
 
-        return True
+    def collect_drawn(self) -> List[str]:
+        """Returns the emojis drawn with since the last call"""
 
-    def clear_cursors(self, *, empty: Optional[bool] = False):
-        for x, row in enumerate(self.board):
-            for y, _ in enumerate(row):
-                cell_tuple = (x, y)
-                self.board[cell_tuple] = self.un_cursor(self.board[cell_tuple])
+        drawn = [self.palette[index] for index in self.drawn]
+        self.drawn.clear()
+        return drawn
+
+    def cells(
+        self, coords: Union[List[Tuple[int, int]], np.ndarray]
+    ) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+        """Converts coords to an index that selects those cells of the pixel array"""
+
+        coords = np.asarray(coords)
+        if coords.dtype == bool:
+            return coords
+
+        coords = coords.reshape(-1, 2)
+        return coords[:, 0], coords[:, 1]
 
-        self.cursor_coords = (
-            [(self.cursor_row, self.cursor_col)] if empty is False else []
+    def clear_cursors(self, *, empty: Optional[bool] = False):
+        self.cursor_bounds = (
+            (
+                self.cursor_row,
+                self.cursor_row + 1,
+                self.cursor_col,
+                self.cursor_col + 1,
+            )
+            if empty is False
+            else None
         )
 
     def move_cursor(
@@ -584,7 +911,6 @@ class Board:
         col_move: Optional[int] = 0,
         select: Optional[bool] = False,
     ):
-        self.clear_cursors()
         self.cursor_row = (self.cursor_row + row_move) % (self.cursor_row_max + 1)
         self.cursor_col = (self.cursor_col + col_move) % (self.cursor_col_max + 1)
 
@@ -592,69 +918,133 @@ class Board:
             self.final_coords = (self.cursor_row, self.cursor_col)
             self.final_row, self.final_col = self.final_coords
 
-            self.cursor_coords = [
-                (row, col)
-                for col in range(
-                    min(self.initial_col, self.final_col),
-                    max(self.initial_col, self.final_col) + 1,
-                )
-                for row in range(
-                    min(self.initial_row, self.final_row),
-                    max(self.initial_row, self.final_row) + 1,
-                )
-            ]
+            self.cursor_bounds = (
+                min(self.initial_row, self.final_row),
+                max(self.initial_row, self.final_row) + 1,
+                min(self.initial_col, self.final_col),
+                max(self.initial_col, self.final_col) + 1,
+            )
         else:
-            self.cursor_coords = [(self.cursor_row, self.cursor_col)]
-            return
+            self.clear_cursors()
+        self.scroll_to_cursor()
+
+    @property
+    def save_size(self) -> int:
+        """Size of each emoji in saved images, smaller for large boards"""
+
+        return fit_size(self.board.shape, max_size=SAVE_MAX_SIZE, size=EMOJI_SIZE)
 
     def save(self) -> Image.Image:
-        line_spacing = -4
-        node_spacing = -2
-
-        w = self.width * (EMOJI_SIZE + node_spacing * 2) - node_spacing * 2
-        h = self.height * (EMOJI_SIZE + line_spacing) - line_spacing
-        with Image.new("RGBA", (w, h), (255, 255, 255, 0)) as image:
-            with Pilmoji(image) as pilmoji:
-                pilmoji.text(
-                    xy=(0, 0),
-                    text=self.str,
-                    fill=(0, 0, 0),
-                    font=FONT(EMOJI_SIZE),
-                    spacing=line_spacing,
-                    node_spacing=node_spacing,
-                )
-            return image
+        return TILE_ATLAS.compose(self.board, self.palette.emojis, size=self.save_size)
 
     async def save_embed(self, bot: Bot, header: str) -> Bot.Embed:
-        image = await bot.loop.run_in_executor(None, self.save)
-        name = SAVE_FILENAME
-        file = image_to_file(image, filename=name)
+        # Copies, since strokes change the board and palette in place while the job is queued
+        image_bytes = await RENDERER.run(
+            render_board, self.board.copy(), list(self.palette.emojis), self.save_size
+        )
+        filename = f"{SAVE_FILENAME}.png"
+        file = discord.File(io.BytesIO(image_bytes), filename=filename)
 
-        filename = f"{name}.png"
         embed = bot.Embed(title=filename)
         embed.set_author(name=header)
         embed.set_image(url=f"attachment://{filename}")
         return embed, file
 
+    async def timelapse_file(self, *, limit: int) -> discord.File:
+        """Renders the history of the board into an animated GIF of at most limit bytes"""
+
+        history = self.history
+        # A snapshot, since the history compacts its base in place as strokes are made
+        changes = [
+            (step.cells.copy(), step.after.copy())
+            for step in history.steps[: history.index]
+        ]
+        image_bytes = await RENDERER.run(
+            functools.partial(
+                render_timelapse,
+                history.base.copy(),
+                changes,
+                list(self.palette.emojis),
+                limit=limit,
+                size=fit_size(
+                    self.board.shape,
+                    max_size=TIMELAPSE_MAX_SIZE,
+                    size=TIMELAPSE_TILE_SIZE,
+                ),
+            )
+        )
+        return discord.File(
+            io.BytesIO(image_bytes), filename=f"{TIMELAPSE_FILENAME}.gif"
+        )
+
     @classmethod
     def from_board(
-        cls, board: np.ndarray, *, background: Optional[str] = TRANSPARENT_EMOJI
+        cls,
+        board: np.ndarray,
+        *,
+        palette: Palette,
+        background: Optional[str] = TRANSPARENT_EMOJI,
     ):
         height = len(board)
         width = len(board[0])
 
         board_obj = cls(height=height, width=width, background=background)
-        board_obj.board_history = [board]
+        board_obj.palette = palette
+        board_obj.palette.index(board_obj.background)
+        board_obj.history = History(board, max_bytes=board_obj.history.max_bytes)
+        board_obj.invalidate()
 
         return board_obj
 
+    def encode(self) -> str:
+        """Encodes the board's pixels, palette and background, see utils/encoding.py"""
+
+        return encode_board(
+            self.board, self.palette.originals, self.palette.index(self.background)
+        )
+
+    @classmethod
+    def decode(cls, string: str) -> Board:
+        pixels, emojis, background = decode_board(string)
+
+        palette = Palette()
+        # The palette may merge emojis that normalize to the same one, so map their indices
+        lookup = np.array([palette.index(emoji) for emoji in emojis], dtype=PIXEL_DTYPE)
+        board = cls.from_board(
+            lookup[pixels], palette=palette, background=emojis[background]
+        )
+        board.clear_cursors()
+        return board
+
+    @property
+    def state_url(self) -> Optional[str]:
+        """A URL that stores the encoded board, None if it's too long for an embed's URL"""
+
+        # Boards larger than the viewport are left out, since they rarely fit and
+        # encoding the whole canvas on every edit would cost more than rendering it
+        if self.paged:
+            return None
+
+        # The embed is rebuilt on every edit, so only encode the board again when it changed
+        key = (self.version, self.background)
+        if self._state_url[0] != key:
+            url = BOARD_STATE_URL + self.encode()
+            self._state_url = (key, url if len(url) <= EMBED_URL_LIMIT else None)
+        return self._state_url[1]
+
     @classmethod
     def from_str(cls, string: str, *, background: Optional[str] = None) -> Board:
         lines = string.split("\n")[2:]
         board = []
         for line in lines:
             board.append(line.split(PADDING)[-1].split("\u200b"))
-        board = cls.from_board(np.array(board, dtype="object"), background=background)
+
+        palette = Palette([background] if background is not None else None)
+        board = cls.from_board(
+            palette.from_emojis(np.array(board, dtype="object")),
+            palette=palette,
+            background=background,
+        )
         board.clear_cursors()
         return board
 
@@ -671,6 +1061,7 @@ class ToolMenu(discord.ui.Select):
             EraseTool(view),
             EyedropperTool(view),
             FillTool(view),
+            DiagonalFillTool(view),
             ReplaceTool(view),
             DarkenTool(view),
             LightenTool(view),
@@ -855,6 +1246,7 @@ class ColourMenu(discord.ui.Select):
         self,
         added_emojis: Dict[Union[int, str], AddedEmoji],
         *,
+        failed: Optional[Dict[str, Exception]] = None,
         notification: Notification,
         interaction: discord.Interaction,
     ):
@@ -862,6 +1254,10 @@ class ColourMenu(discord.ui.Select):
             f"{added_emoji.emoji} - {added_emoji.status}"
             for added_emoji in added_emojis.values()
         ]
+        # Colours that could not be uploaded
+        response.extend(
+            f"`{hex}` - Failed ({error})." for hex, error in (failed or {}).items()
+        )
         if len(response) == 0:
             return await notification.edit("Aborted.", interaction=interaction)
 
@@ -961,8 +1357,8 @@ class ColourMenu(discord.ui.Select):
 
             total_matches = hex_matches + rgb_a_matches
 
-            ## Organize all the matches into SentEmoji objects
-            sent_emojis = []
+            ## Collect all the colours with the index they were sent at
+            colours: List[Tuple[int, Colour]] = []
             for match in total_matches:
                 base = 16 if match in hex_matches else 10
 
@@ -974,44 +1370,62 @@ class ColourMenu(discord.ui.Select):
                     base,
                 )
 
-                colour = Colour((red, green, blue, alpha))
-
-                emoji = await self.bot.upload_emoji(
-                    colour, draw_view=self.view, interaction=interaction
-                )
-
-                sent_emojis.append(SentEmoji(emoji=emoji, index=match.start()))
+                colours.append((match.start(), Colour((red, green, blue, alpha))))
 
             emoji_matches = self.extract_emojis(content)
-            for match in emoji_matches:
-                colour = await Colour.from_emoji(match.emoji)
-                emoji = await self.bot.upload_emoji(
-                    colour, draw_view=self.view, interaction=interaction
-                )
-
-                sent_emojis.append(SentEmoji(emoji=emoji, index=match.index))
+            emoji_colours = await asyncio.gather(
+                *(Colour.from_emoji(match.emoji) for match in emoji_matches)
+            )
+            colours.extend(
+                (match.index, colour)
+                for match, colour in zip(emoji_matches, emoji_colours)
+            )
 
+            failed: Dict[str, Exception] = {}
             if msg.attachments:
                 # Extract from first attachment
-                attachment_colours = await Colour.from_attachment(msg.attachments[0])
-                for colour in attachment_colours:
-                    emoji = await self.bot.upload_emoji(
-                        colour, draw_view=self.view, interaction=interaction
-                    )
+                attachment = msg.attachments[0]
+                try:
+                    attachment_colours = await Colour.from_attachment(attachment)
+                except (
+                    ImageTooLargeError,
+                    UnidentifiedImageError,
+                    asyncio.TimeoutError,
+                    RenderError,
+                ) as error:
+                    failed[attachment.filename] = error
+                    attachment_colours = []
+                start_index = max([index for index, _ in colours] + [0]) + 1
+                colours.extend(
+                    (start_index + idx, colour)
+                    for idx, (colour, _share) in enumerate(attachment_colours)
+                )
 
-                    sent_emojis.append(
-                        SentEmoji(
-                            emoji=emoji,
-                            index=max([e.index for e in sent_emojis] + [0]) + 1,
-                        )
-                    )
+            # Upload all the colours at once
+            uploaded = await self.bot.upload_emojis(
+                [colour for _, colour in colours],
+                draw_view=self.view,
+                interaction=interaction,
+            )
+
+            ## Organize all the uploaded emojis into SentEmoji objects
+            sent_emojis = []
+            for index, colour in colours:
+                result = uploaded[colour.hex]
+                if isinstance(result, Exception):
+                    failed[colour.hex] = result
+                    continue
+                sent_emojis.append(SentEmoji(emoji=result, index=index))
 
             sent_emojis.sort(key=lambda emoji: emoji.index)
 
             added_emojis = self.append_sent_emojis(sent_emojis)
 
             await self.added_emojis_respond(
-                added_emojis, notification=notification, interaction=interaction
+                added_emojis,
+                failed=failed,
+                notification=notification,
+                interaction=interaction,
             )
 
         # First it checks if the Add Emoji option was selected. Takes second priority
@@ -1063,7 +1477,9 @@ class ColourMenu(discord.ui.Select):
                 interaction=interaction,
             )
 
-            colours = [await Colour.from_emoji(emoji) for emoji in selected_emojis]
+            colours = await asyncio.gather(
+                *(Colour.from_emoji(emoji) for emoji in selected_emojis)
+            )
 
             mixed_colour = Colour.mix_colours(colours)
 
@@ -1076,7 +1492,7 @@ class ColourMenu(discord.ui.Select):
             )
 
             option = discord.SelectOption(
-                label=mixed_colour.hex,
+                label=emoji.name,
                 emoji=emoji,
                 value=str(emoji),
             )
@@ -1100,6 +1516,9 @@ class ColourMenu(discord.ui.Select):
 
 
 class DrawView(discord.ui.View):
+    # Every draw view that is still referenced
+    instances: weakref.WeakSet[DrawView] = weakref.WeakSet()
+
     def __init__(
         self,
         board: Board,
@@ -1107,9 +1526,12 @@ class DrawView(discord.ui.View):
         ctx: commands.Context,
         tool_options: Optional[List[discord.SelectOption]] = None,
         colour_options: Optional[List[discord.SelectOption]] = None,
+        snapping: Optional[SnapMode] = "off",
     ):
         super().__init__(timeout=600)
         self.board: Board = board
+        # How colours are snapped before their emojis are created
+        self.snapping: SnapMode = snapping
 
         self.ctx: commands.Context = ctx
         self.bot: Bot = self.ctx.bot
@@ -1126,33 +1548,124 @@ class DrawView(discord.ui.View):
 
         self.disabled: bool = False
         self.secondary_page: bool = False
+        # Whether the board is sent as an image instead of emojis, which it
+        # also is whenever the emojis would not fit in the embed's description
+        self.image_mode: bool = False
+        # The last preview sent and its attachment, so it's only uploaded again when it changes
+        self._preview_sent: Tuple[Optional[bytes], Optional[discord.Attachment]] = (
+            None,
+            None,
+        )
         self.load_items()
 
         self.response: discord.Message = None
-        self.lock: asyncio.Lock = self.bot.lock
 
         self.notifications: List[Notification] = [Notification(view=self)]
+        self._notification_field: Optional[str] = None
+
+        # The message edit scheduler, see edit_message
+        self._edit_task: Optional[asyncio.Task] = None
+        self._pending_edit: Optional[asyncio.Future] = None
+        self._edit_interaction: Optional[discord.Interaction] = None
+        self._last_edit: float = 0.0
+
+        # The reactions of the author on the message, as seen by the reaction loop
+        self.reactions: Set[str] = set()
+        # REST calls made and skipped, by call
+        self.rest_calls: typing.Counter[str] = Counter()
+        self.rest_calls_skipped: typing.Counter[str] = Counter()
+
+        DrawView.instances.add(self)
+
+    @property
+    def shows_preview(self) -> bool:
+        return self.image_mode or len(self.board.render()) > EMBED_DESC_CHAR_LIMIT
 
     @property
     def embed(self):
-        embed = self.bot.Embed(title=f"{self.ctx.author}'s drawing board.")
-
-        # Render the cursors on a board copy
-        board = copy.deepcopy(self.board)
-        for row, col in board.cursor_coords:
-            cell = board.board[row, col]
-            board.board[row, col] = CURSOR.get(cell, cell)
-
-        # The actual board
-        embed.description = str(board)
-
-        # This section adds the notification field only if any one
-        # of the notifications is not empty. In such a case, it only
-        # shows the notification(s) that is not empty
-        if any((len(n.content) != 0 for n in self.notifications)):
-            embed.add_field(
-                name="Notifications",
-                value="\n\n".join(
+        embed = self.bot.Embed(
+            title=f"{self.ctx.author}'s drawing board.", url=self.board.state_url
+        )
+
+        if self.shows_preview:
+            embed.description = self.board.cursor_text
+            embed.set_image(url=f"attachment://{PREVIEW_FILENAME}.png")
+        else:
+            # The actual board, with the cursors rendered on top
+            embed.description = self.board.render()
+
+        if (notification_field := self.notification_field) is not None:
+            embed.add_field(name="Notifications", value=notification_field)
+
+        embed.set_footer(
+            text=(
+                f"{self.board.viewport_text}\n{self.footer_text}"
+                if self.board.paged and not self.shows_preview
+                else self.footer_text
+            )
+        )
+        return embed
+
+    async def attachments(self) -> List[Union[discord.File, discord.Attachment]]:
+        """The attachments of the message, which is the preview if the board is shown as one"""
+
+        if not self.shows_preview:
+            return []
+
+        sent, attachment = self._preview_sent
+        try:
+            png = await self.board.preview_png()
+        except (RenderError, asyncio.TimeoutError):
+            # Keep the last preview rather than failing the edit
+            return [attachment] if attachment is not None else []
+        if png is sent and attachment is not None:
+            # Keep the attachment that is already on the message
+            return [attachment]
+        return [discord.File(io.BytesIO(png), filename=f"{PREVIEW_FILENAME}.png")]
+
+    def preview_sent(self, message: discord.Message, attachments: List):
+        if not attachments:
+            # The preview was removed from the message, so it has to be uploaded again
+            self._preview_sent = (None, None)
+        elif any(isinstance(attachment, discord.File) for attachment in attachments):
+            self._preview_sent = (
+                self.board.preview.png,
+                discord.utils.get(
+                    message.attachments, filename=f"{PREVIEW_FILENAME}.png"
+                ),
+            )
+
+    def session(self) -> Session:
+        """A snapshot of the state of the view, to be persisted so that it can be resumed"""
+
+        board = self.board
+        return Session(
+            message_id=self.response.id,
+            channel_id=self.response.channel.id,
+            author_id=self.ctx.author.id,
+            background=board.background,
+            palette=list(board.palette.originals),
+            history=pack_history(board.history),
+            cursor=board.cursor,
+            cursor_row=board.cursor_row,
+            cursor_col=board.cursor_col,
+            tool=self.primary_tool.name.lower(),
+            snapping=self.snapping,
+            image_mode=self.image_mode,
+            colour_options=[
+                str(option.emoji)
+                for option in self.colour_menu.options[self.colour_menu.END_INDEX :]
+            ],
+        )
+
+    @property
+    def notification_field(self) -> Optional[str]:
+        if self._notification_field is None:
+            # This section adds the notification field only if any one
+            # of the notifications is not empty. In such a case, it only
+            # shows the notification(s) that is not empty
+            if any((len(n.content) != 0 for n in self.notifications)):
+                value = "\n\n".join(
                     [
                         (
                             f"{str(n.emoji)} "
@@ -1164,17 +1677,24 @@ class DrawView(discord.ui.View):
                         else ""  # Show only non-empty notifications
                         for idx, n in enumerate(self.notifications)
                     ]
-                ),
-            )
+                )
+            else:
+                value = ""
+            self._notification_field = value
+        return self._notification_field or None
 
-        embed.set_footer(
-            text=(
-                f"The board looks wack? Try decreasing its size! Do {self.ctx.clean_prefix}help draw for more info."
-                if any((len(board.row_labels) >= 10, len(board.col_labels) >= 10))
-                else f"You can customize this board! Do {self.ctx.clean_prefix}help draw for more info."
+    def invalidate_notifications(self):
+        self._notification_field = None
+
+    @cached_property
+    def footer_text(self) -> str:
+        return (
+            f"The board looks wack? Try decreasing its size! Do {self.ctx.clean_prefix}help draw for more info."
+            if any(
+                (len(self.board.row_labels) >= 10, len(self.board.col_labels) >= 10)
             )
+            else f"You can customize this board! Do {self.ctx.clean_prefix}help draw for more info."
         )
-        return embed
 
     def reaction_check(self, reaction: discord.Reaction, user: discord.User):
         return reaction.message.id == self.response.id and user.id == self.ctx.author.id
@@ -1214,6 +1734,12 @@ class DrawView(discord.ui.View):
                 future.cancel()
             ###
 
+            # Mirror the author's reactions so that edits know which ones need removing
+            if task is reaction_add:
+                self.reactions.add(str(reaction.emoji))
+            elif task is reaction_remove:
+                self.reactions.discard(str(reaction.emoji))
+
             if str(reaction.emoji) == AUTO_DRAW_EMOJI:
                 if task is reaction_add:
                     self.auto = True
@@ -1250,6 +1776,7 @@ class DrawView(discord.ui.View):
 
         notification = Notification(content, emoji=emoji, view=self)
         self.notifications.insert(0, notification)
+        self.invalidate_notifications()
 
         if interaction is not None:
             await self.edit_message(interaction)
@@ -1278,9 +1805,14 @@ class DrawView(discord.ui.View):
 
     async def on_timeout(self):
         self.stop_view()
+        command = self.ctx.command.root_parent or self.ctx.command
         self.add_item(
             discord.ui.Button(
-                label=f"This interaction has timed out. Use `{self.ctx.prefix}{self.ctx.command} copy` for a new one.",
+                label=(
+                    f"This interaction has timed out. Use `{self.ctx.prefix}{command} resume` to continue it."
+                    if self.bot.session_store.enabled
+                    else f"This interaction has timed out. Use `{self.ctx.prefix}{command} copy` for a new one."
+                ),
                 style=discord.ButtonStyle.gray,
                 disabled=True,
             )
@@ -1302,26 +1834,29 @@ class DrawView(discord.ui.View):
 
         notification = None
         msg = None
-        if self.lock.locked():
+        dispatcher = self.bot.message_dispatcher
+        if dispatcher.waiting(self.ctx.channel.id, self.ctx.author.id):
             await interaction.followup.send(
                 "Another message is being waited for, please wait until that process is complete.",
                 ephemeral=True,
             )
             return notification, msg
 
-        async with self.disable(interaction=interaction, first_edit=False):
-            if content is not None:
-                notification = await self.create_notification(
-                    content + "\nSend anything else to abort.",
-                    emoji=emoji,
-                    interaction=interaction,
-                )
-            else:
-                notification = await self.create_notification(content, emoji=emoji)
+        with dispatcher.listen(
+            self.ctx.channel.id, self.ctx.author.id, check=check
+        ) as future:
+            async with self.disable(interaction=interaction, first_edit=False):
+                if content is not None:
+                    notification = await self.create_notification(
+                        content + "\nSend anything else to abort.",
+                        emoji=emoji,
+                        interaction=interaction,
+                    )
+                else:
+                    notification = await self.create_notification(content, emoji=emoji)
 
-            async with self.lock:
                 try:
-                    msg = await self.bot.wait_for("message", timeout=30, check=check)
+                    msg = await asyncio.wait_for(future, timeout=30)
                 except asyncio.TimeoutError:
                     await notification.edit(
                         "Timed out, aborted.", interaction=interaction
@@ -1333,17 +1868,6 @@ class DrawView(discord.ui.View):
             await self.edit_message(interaction)
         return notification, msg
 
-    @property
-    def placeholder_button(self) -> discord.ui.Button:
-        button = discord.ui.Button(
-            label="\u200b",
-            style=discord.ButtonStyle.gray,
-            custom_id=str(len(self.children)),
-        )
-        button.callback = lambda interaction: interaction.response.defer()
-
-        return button
-
     def load_items(self):
         self.clear_items()
         self.add_item(self.tool_menu)
@@ -1361,7 +1885,7 @@ class DrawView(discord.ui.View):
             self.add_item(self.left)
             self.add_item(self.set_cursor)
             self.add_item(self.right)
-            self.add_item(self.placeholder_button)
+            self.add_item(self.preview_btn)
 
             self.add_item(self.primary_tool)
             self.add_item(self.down_left)
@@ -1380,7 +1904,7 @@ class DrawView(discord.ui.View):
             self.add_item(self.left)
             self.add_item(self.set_cursor)
             self.add_item(self.right)
-            self.add_item(self.placeholder_button)
+            self.add_item(self.timelapse_btn)
 
             self.add_item(self.primary_tool)
             self.add_item(self.down_left)
@@ -1397,13 +1921,14 @@ class DrawView(discord.ui.View):
             else discord.ButtonStyle.grey
         )
 
-        self.undo.disabled = self.board.board_index == 0 or self.disabled
-        self.undo.label = f"{self.board.board_index} ↶"
-        self.redo.disabled = (
-            self.board.board_index == len(self.board.board_history) - 1
-        ) or self.disabled
-        self.redo.label = (
-            f"↷ {(len(self.board.board_history) - 1) - self.board.board_index}"
+        history = self.board.history
+        self.undo.disabled = not history.can_undo() or self.disabled
+        self.undo.label = f"{history.undo_count} ↶"
+        self.redo.disabled = not history.can_redo() or self.disabled
+        self.redo.label = f"↷ {history.redo_count}"
+
+        self.preview_btn.style = (
+            discord.ButtonStyle.green if self.image_mode else discord.ButtonStyle.grey
         )
 
     @asynccontextmanager
@@ -1433,40 +1958,94 @@ class DrawView(discord.ui.View):
             if second_edit is True:
                 await self.edit_message(interaction)
 
+    def touch_emojis(self):
+        """Marks the colour emojis drawn with since the last edit as used"""
+
+        emoji_ids = [
+            partial_emoji.id
+            for emoji in self.board.collect_drawn()
+            if (partial_emoji := discord.PartialEmoji.from_str(emoji)).is_custom_emoji()
+        ]
+        if emoji_ids:
+            self.bot.emoji_pool.touch(emoji_ids)
+
+    async def remove_reaction(self, emoji: str):
+        """Removes a reaction of the author, if the reaction loop has seen it being added"""
+
+        if emoji not in self.reactions:
+            self.rest_calls_skipped["remove_reaction"] += 1
+            return
+        self.reactions.discard(emoji)
+        self.rest_calls["remove_reaction"] += 1
+        await self.response.remove_reaction(emoji, self.ctx.author)
+
     async def edit_message(self, interaction: Optional[discord.Interaction] = None):
+        """Schedules an edit of the message with the latest state, and waits until it is done.
+
+        At most one edit is in flight at a time. Edits requested while one is in flight, or
+        within EDIT_COALESCE_DELAY after it, are coalesced into a single edit of the state at
+        the time it is sent, so that fast clicking doesn't queue up an edit per click.
+        """
+
+        if interaction is not None:
+            self._edit_interaction = interaction
+        if self._pending_edit is None:
+            self._pending_edit = self.bot.loop.create_future()
+        else:
+            self.rest_calls_skipped["edit"] += 1
+        if self._edit_task is None or self._edit_task.done():
+            self._edit_task = self.bot.loop.create_task(self._edit_loop())
+        # Shield it so that one caller being cancelled does not cancel the edit for the others
+        await asyncio.shield(self._pending_edit)
+
+    async def _edit_loop(self):
+        while self._pending_edit is not None:
+            # Give more edit requests a chance to pile up if the last edit was just now
+            delay = self._last_edit + EDIT_COALESCE_DELAY - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            future, self._pending_edit = self._pending_edit, None
+            interaction, self._edit_interaction = self._edit_interaction, None
+            try:
+                await self._edit_message(interaction)
+            except Exception as error:
+                future.set_exception(error)
+            else:
+                future.set_result(None)
+            finally:
+                self._last_edit = time.monotonic()
+
+    async def _edit_message(self, interaction: Optional[discord.Interaction] = None):
         self.update_buttons()
+        self.touch_emojis()
         if self.auto is False:
-            await self.response.remove_reaction(AUTO_DRAW_EMOJI, self.ctx.author)
+            await self.remove_reaction(AUTO_DRAW_EMOJI)
         if self.select is False:
-            await self.response.remove_reaction(SELECT_EMOJI, self.ctx.author)
+            await self.remove_reaction(SELECT_EMOJI)
+        self.rest_calls["edit"] += 1
         try:
+            attachments = await self.attachments()
             if interaction is None:
-                await self.response.edit(embed=self.embed, view=self)
+                message = await self.response.edit(
+                    embed=self.embed, attachments=attachments, view=self
+                )
             else:
-                await interaction.edit_original_response(embed=self.embed, view=self)
+                message = await interaction.edit_original_response(
+                    embed=self.embed, attachments=attachments, view=self
+                )
+            self.preview_sent(message, attachments)
+            # Only marks the session as changed, it is written in the background
+            self.bot.session_store.save(self.response.id, self.session)
 
             # print(f'[{datetime.datetime.strftime(datetime.datetime.utcnow() + datetime.timedelta(), "%H:%M:%S")}]: Edited')
         except discord.HTTPException as error:
             if match := re.search(
                 "In embeds\.\d+\.description: Must be 4096 or fewer in length\.",
                 error.text,
-            ):  # If the description reaches char limit
-                content = f"Max characters reached ({len(self.embed.description)}). Please remove some custom emojis from the board.\nCustom emojis take up more than 20 characters each, while most unicode/default ones take up 1!\nMaximum is 4096 characters due to discord limitations."
-
-                if interaction is None:
-                    await self.response.channel.send(
-                        content=content,
-                    )
-                else:
-                    await interaction.followup.send(
-                        content=content,
-                        ephemeral=True,
-                    )
-                self.board.board_index -= 1
-                self.board.board_history = self.board.board_history[
-                    : self.board.board_index + 1
-                ]
-                await self.edit_message(interaction)
+            ):  # If the description reaches char limit, show the board as an image instead
+                self.image_mode = True
+                await self._edit_message(interaction)
 
             elif match := re.search(
                 "In components\.\d+\.components\.\d+\.options\.(?P<option>\d+)\.emoji\.id: Invalid emoji",
@@ -1487,7 +2066,7 @@ class DrawView(discord.ui.View):
                         content=content,
                         ephemeral=True,
                     )
-                await self.edit_message(interaction)
+                await self._edit_message(interaction)
             else:
                 if interaction is None:
                     await self.response.channel.send(error)
@@ -1513,8 +2092,7 @@ class DrawView(discord.ui.View):
     @discord.ui.button(label="↶", style=discord.ButtonStyle.grey)
     async def undo(self, interaction: discord.Interaction, button: discord.Button):
         await interaction.response.defer()
-        if self.board.board_index > 0:
-            self.board.board_index -= 1
+        self.board.undo()
         await self.edit_message(interaction)
 
     @discord.ui.button(
@@ -1573,8 +2151,7 @@ class DrawView(discord.ui.View):
     @discord.ui.button(label="↷", style=discord.ButtonStyle.grey)
     async def redo(self, interaction: discord.Interaction, button: discord.Button):
         await interaction.response.defer()
-        if self.board.board_index < len(self.board.board_history) - 1:
-            self.board.board_index += 1
+        self.board.redo()
         await self.edit_message(interaction)
 
     @discord.ui.button(
@@ -1617,8 +2194,10 @@ class DrawView(discord.ui.View):
             return
         cell = msg.content.upper()
 
-        ABC = ALPHABETS[: self.board.cursor_row_max + 1]
-        NUM = NUMBERS[: self.board.cursor_col_max + 1]
+        # The cell is given by the labels of the viewport
+        board = self.board
+        ABC = ALPHABETS[: board.view_height]
+        NUM = NUMBERS[: board.view_width]
 
         # There is absolutely no reason to use regex here but fuck it we ball
         CELL_REGEX = f"^(?P<row>[A-{ABC[-1]}])(?P<col>[0-9]|(?:1[0-{NUM[-1] % 10}]))$"
@@ -1634,20 +2213,30 @@ class DrawView(discord.ui.View):
             match = re.match(ROW_OR_COL_REGEX, cell)
             if match is not None:
                 row_key = match.group("row")
-                row_key = row_key if row_key is not None else ABC[self.board.cursor_row]
+                row_key = (
+                    row_key
+                    if row_key is not None
+                    else ABC[board.cursor_row - board.view_row]
+                )
 
                 col_key = match.group("col")
-                col_key = int(col_key) if col_key is not None else self.board.cursor_col
+                col_key = (
+                    int(col_key)
+                    if col_key is not None
+                    else board.cursor_col - board.view_col
+                )
             else:
                 row_key = col_key = None
 
         if row_key not in ABC or col_key not in NUM:
             return await notification.edit("Aborted.", interaction=interaction)
 
-        row_move = LETTER_TO_NUMBER[row_key] - self.board.cursor_row
-        col_move = col_key - self.board.cursor_col
+        row = board.view_row + LETTER_TO_NUMBER[row_key]
+        col = board.view_col + col_key
+        row_move = row - board.cursor_row
+        col_move = col - board.cursor_col
         await notification.edit(
-            f"Moved cursor to **{cell}** ({LETTER_TO_NUMBER[row_key]}, {col_key})",
+            f"Moved cursor to **{cell}** ({row}, {col})",
         )
         await self.move_cursor(interaction, row_move=row_move, col_move=col_move)
 
@@ -1660,6 +2249,14 @@ class DrawView(discord.ui.View):
         col_move = 1
         await self.move_cursor(interaction, row_move=row_move, col_move=col_move)
 
+    @discord.ui.button(emoji=PREVIEW_EMOJI, style=discord.ButtonStyle.grey)
+    async def preview_btn(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ):
+        await interaction.response.defer()
+        self.image_mode = not self.image_mode
+        await self.edit_message(interaction)
+
     # 3rd / Last Row
     @discord.ui.button(
         emoji="<:down_left:1032565090223935518>", style=discord.ButtonStyle.blurple
@@ -1696,9 +2293,41 @@ class DrawView(discord.ui.View):
     async def save_btn(self, interaction: discord.Interaction, button: discord.Button):
         await interaction.response.defer(thinking=True)
 
-        embed, file = await self.board.save_embed(
-            self.bot, f"{interaction.user}'s masterpiece ✨"
+        try:
+            embed, file = await self.board.save_embed(
+                self.bot, f"{interaction.user}'s masterpiece ✨"
+            )
+        except (RenderError, asyncio.TimeoutError):
+            return await interaction.followup.send(
+                "This drawing could not be saved, please try again."
+            )
+        await interaction.followup.send(embed=embed, file=file)
+
+    @discord.ui.button(emoji=TIMELAPSE_EMOJI, style=discord.ButtonStyle.green)
+    async def timelapse_btn(
+        self, interaction: discord.Interaction, button: discord.Button
+    ):
+        await interaction.response.defer(thinking=True)
+
+        limit = (
+            interaction.guild.filesize_limit
+            if interaction.guild is not None
+            else DEFAULT_FILESIZE_LIMIT
         )
+        try:
+            file = await self.board.timelapse_file(limit=limit)
+        except (TimelapseTooLargeError, asyncio.TimeoutError):
+            return await interaction.followup.send(
+                "The timelapse of this drawing is too large to upload."
+            )
+        except RenderError:
+            return await interaction.followup.send(
+                "The timelapse of this drawing could not be made, please try again."
+            )
+
+        embed = self.bot.Embed(title=file.filename)
+        embed.set_author(name=f"{interaction.user}'s timelapse ✨")
+        embed.set_image(url=f"attachment://{file.filename}")
         await interaction.followup.send(embed=embed, file=file)
 
 
@@ -1710,10 +2339,24 @@ class Draw(commands.Cog):
 
     display_emoji = "🖌️"
 
+    async def cog_load(self):
+        self.save_emoji_usage.start()
+
+    @commands.Cog.listener("on_message")
+    async def dispatch_message(self, message: discord.Message):
+        self.bot.message_dispatcher.dispatch(message)
+
     @force_log_errors
     async def cog_unload(self):
+        self.save_emoji_usage.cancel()
+        self.bot.emoji_pool.save()
+        RENDERER.shutdown()
         reload_modules("cogs/Draw", skip=__name__)
 
+    @tasks.loop(minutes=1)
+    async def save_emoji_usage(self):
+        self.bot.emoji_pool.save()
+
     @commands.bot_has_permissions(external_emojis=True)
     @commands.hybrid_group(
         name="draw",
@@ -1736,11 +2379,15 @@ class Draw(commands.Cog):
             "🟥", "🟧", "🟨", "🟩", "🟦", "🟪", "🟫", "⬛", "⬜", "transparent"
         ] = "⬜",
     ) -> None:
-        if MIN_HEIGHT_OR_WIDTH > height > MAX_HEIGHT_OR_WIDTH:
-            return await ctx.send("Height must be atleast 5 and atmost 17")
+        if not MIN_HEIGHT_OR_WIDTH <= height <= MAX_CANVAS_SIZE:
+            return await ctx.send(
+                f"Height must be atleast {MIN_HEIGHT_OR_WIDTH} and atmost {MAX_CANVAS_SIZE}"
+            )
 
-        if MIN_HEIGHT_OR_WIDTH > width > MAX_HEIGHT_OR_WIDTH:
-            return await ctx.send("Width must be atleast 5 and atmost 17")
+        if not MIN_HEIGHT_OR_WIDTH <= width <= MAX_CANVAS_SIZE:
+            return await ctx.send(
+                f"Width must be atleast {MIN_HEIGHT_OR_WIDTH} and atmost {MAX_CANVAS_SIZE}"
+            )
 
         if background == TRANSPARENT_KEY:
             background = TRANSPARENT_EMOJI
@@ -1760,7 +2407,7 @@ class Draw(commands.Cog):
             await ctx.reply("That's not a valid draw message!")
             return None
 
-        description = message.embeds[0].description
+        embed = message.embeds[0]
 
         old_view = discord.ui.View.from_message(message, timeout=0)
         if len(old_view.children) > 2:
@@ -1770,11 +2417,24 @@ class Draw(commands.Cog):
             tool_options = None
             colour_options = old_view.children[0].options
 
-        for option in colour_options:
-            if option.label.endswith(" (bg)"):
-                background = str(option.emoji)
-
-        board = Board.from_str(description, background=background)
+        board = None
+        if embed.url is not None and embed.url.startswith(BOARD_STATE_URL):
+            with contextlib.suppress(BoardEncodingError):
+                board = Board.decode(embed.url[len(BOARD_STATE_URL) :])
+
+        # Boards that are too large to encode in the URL, or from before it was added
+        if board is None:
+            # Only the viewport of a board larger than it is in the description,
+            # and none of a board shown as an image
+            if embed.image.url is not None or (embed.footer.text or "").startswith(
+                VIEWPORT_TEXT_PREFIX
+            ):
+                await ctx.reply("That board is too large to be copied from its message!")
+                return None
+            for option in colour_options:
+                if option.label.endswith(" (bg)"):
+                    background = str(option.emoji)
+            board = Board.from_str(embed.description, background=background)
         return board, tool_options, colour_options
 
     @draw.command(
@@ -1811,6 +2471,222 @@ class Draw(commands.Cog):
         )
         await start_view.start()
 
+    @draw.command(
+        name="resume",
+        brief="Resume a drawing.",
+        help=(
+            "Continue a drawing that timed out or was stopped, even across restarts, with its "
+            "palette, history and tools, by using its message link, or your latest drawing."
+        ),
+        description="Resume a drawing that timed out or was stopped.",
+    )
+    async def resume(self, ctx: CustomContext, message_link: Optional[str] = None):
+        message = None
+        if message_link is not None:
+            with contextlib.suppress(commands.BadArgument, discord.HTTPException):
+                message = await commands.MessageConverter().convert(ctx, message_link)
+        if ref := ctx.message.reference:
+            message = ref.resolved
+        message_id = message.id if isinstance(message, discord.Message) else None
+
+        if not self.bot.session_store.enabled:
+            return await ctx.reply(
+                "Drawings can't be resumed right now, since they aren't being saved."
+            )
+        try:
+            session = await self.bot.session_store.fetch(
+                author_id=ctx.author.id, message_id=message_id
+            )
+        except (asyncpg.PostgresError, OSError):
+            return await ctx.reply(
+                "Saved drawings couldn't be loaded right now, please try again later."
+            )
+        if session is None:
+            return await ctx.reply("No drawing of yours was found to resume.")
+
+        for view in DrawView.instances:
+            if (
+                not view.is_finished()
+                and view.response is not None
+                and view.response.id == session.message_id
+            ):
+                return await ctx.reply(
+                    f"That drawing is still active: {view.response.jump_url}"
+                )
+
+        palette = Palette(session.palette)
+        try:
+            # With the budget of the largest board, so that no steps are dropped while replaying
+            history = decode_history(
+                session.history,
+                palette_size=len(palette),
+                max_bytes=HISTORY_MAX_BYTES
+                * -(-(MAX_CANVAS_SIZE**2) // VIEWPORT_SIZE**2),
+            )
+        except BoardEncodingError:
+            return await ctx.reply("That drawing could not be resumed.")
+        board = Board.from_board(
+            history.current, palette=palette, background=session.background
+        )
+        history.max_bytes = board.history.max_bytes
+        history.compact()
+        board.history = history
+        board.invalidate()
+        board.drawn.update(np.unique(board.board).tolist())
+        board.cursor = session.cursor
+        board.cursor_row = min(session.cursor_row, board.cursor_row_max)
+        board.cursor_col = min(session.cursor_col, board.cursor_col_max)
+        board.move_cursor()
+
+        draw_view = DrawView(
+            board,
+            ctx=ctx,
+            snapping=session.snapping if session.snapping in SNAP_MODES else "off",
+        )
+        draw_view.image_mode = session.image_mode
+        draw_view.primary_tool = draw_view.tool_menu.tools.get(
+            session.tool, draw_view.primary_tool
+        )
+        draw_view.tool_menu.set_default(
+            draw_view.tool_menu.value_to_option(draw_view.primary_tool.name.lower())
+        )
+        for emoji in session.colour_options:
+            partial_emoji = discord.PartialEmoji.from_str(emoji)
+            draw_view.colour_menu.append_option(
+                discord.SelectOption(
+                    label=partial_emoji.name, emoji=partial_emoji, value=emoji
+                )
+            )
+        draw_view.load_items()
+
+        draw_view.response = await ctx.send(embed=draw_view.embed, view=draw_view)
+        # Custom emojis only render when the message is edited, which also attaches the preview
+        await draw_view.edit_message()
+        await self.bot.session_store.delete(session.message_id)
+        await draw_view.start()
+
+    @staticmethod
+    def import_size(
+        image_height: int,
+        image_width: int,
+        height: Optional[int] = None,
+        width: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        """The size of the board an image is imported into, following the image's
+        aspect ratio for the sides that aren't given"""
+
+        if height is None and width is None:
+            scale = VIEWPORT_SIZE / max(image_height, image_width)
+            height, width = image_height * scale, image_width * scale
+        elif height is None:
+            height = width * image_height / image_width
+        elif width is None:
+            width = height * image_width / image_height
+
+        return tuple(
+            min(max(round(side), MIN_HEIGHT_OR_WIDTH), MAX_CANVAS_SIZE)
+            for side in (height, width)
+        )
+
+    @draw.command(
+        name="import",
+        brief="Import an image as a drawing.",
+        help=(
+            "Turn an attached image into a drawing. The image is shrunk to the size of the board, "
+            "and its colours are reduced to at most `colours` colour emojis. If height or width "
+            "aren't given, they follow the aspect ratio of the image."
+        ),
+        description="Import an image as a drawing.",
+    )
+    async def import_(
+        self,
+        ctx: CustomContext,
+        image: discord.Attachment,
+        height: Optional[int] = None,
+        width: Optional[int] = None,
+        colours: Optional[int] = IMPORT_DEFAULT_COLOURS,
+        background: Literal[
+            "🟥", "🟧", "🟨", "🟩", "🟦", "🟪", "🟫", "⬛", "⬜", "transparent"
+        ] = "⬜",
+    ):
+        for name, side in (("Height", height), ("Width", width)):
+            if side is not None and not MIN_HEIGHT_OR_WIDTH <= side <= MAX_CANVAS_SIZE:
+                return await ctx.send(
+                    f"{name} must be atleast {MIN_HEIGHT_OR_WIDTH} and atmost {MAX_CANVAS_SIZE}"
+                )
+        if not 1 <= colours <= IMPORT_MAX_COLOURS:
+            return await ctx.send(
+                f"Colours must be atleast 1 and atmost {IMPORT_MAX_COLOURS}"
+            )
+        if image.width is None or image.height is None:
+            return await ctx.reply("That's not an image!")
+        if image.size > IMPORT_MAX_BYTES:
+            return await ctx.reply(
+                f"That image is too large, it can be atmost {IMPORT_MAX_BYTES // (1024 * 1024)} MB."
+            )
+
+        height, width = self.import_size(image.height, image.width, height, width)
+        background = TRANSPARENT_EMOJI if background == TRANSPARENT_KEY else background
+
+        async with ctx.typing():
+            try:
+                indices, rgba = await RENDERER.run(
+                    quantize_image, await image.read(), (width, height), colours
+                )
+            except (
+                ImageTooLargeError,
+                UnidentifiedImageError,
+                asyncio.TimeoutError,
+                RenderError,
+            ):
+                return await ctx.reply("That image could not be imported.")
+
+            # Reuse existing colour emojis close enough to the image's colours
+            colour_objs = [Colour(tuple(values)) for values in rgba.tolist()]
+            uploaded = await self.bot.upload_emojis(colour_objs, snapping="emoji")
+
+        palette = Palette([background])
+        emojis = [uploaded[colour.hex] for colour in colour_objs]
+        failed = {
+            colour.hex: emoji
+            for colour, emoji in zip(colour_objs, emojis)
+            if isinstance(emoji, Exception)
+        }
+        # Transparent pixels, and colours that could not be uploaded, are left as the background
+        lookup = np.array(
+            [
+                palette.index(
+                    background if isinstance(emoji, Exception) else str(emoji)
+                )
+                for emoji in emojis
+            ]
+            + [palette.index(background)],
+            dtype=PIXEL_DTYPE,
+        )
+        board = Board.from_board(
+            lookup[indices], palette=palette, background=background
+        )
+        board.drawn.update(np.unique(board.board).tolist())
+
+        # Add the most used colours to the palette menu
+        colour_menu = ColourMenu(background=background)
+        for emoji in [emoji for emoji in emojis if not isinstance(emoji, Exception)][
+            : 25 - colour_menu.END_INDEX
+        ]:
+            colour_menu.append_option(
+                discord.SelectOption(label=emoji.name, emoji=emoji, value=str(emoji))
+            )
+
+        if failed:
+            await ctx.reply(
+                "Some colours could not be added and were left as the background: "
+                + ", ".join(f"`{hex}`" for hex in failed)
+            )
+        start_view = StartView(
+            ctx=ctx, board=board, colour_options=colour_menu.options
+        )
+        await start_view.start()
+
     @draw.command(
         name="save",
         aliases=("export",),
@@ -1836,11 +2712,175 @@ class Draw(commands.Cog):
 
         board, tool_options, colour_options = items
 
-        embed, file = await board.save_embed(
-            self.bot, message.embeds[0].title.replace("drawing board.", "masterpiece ✨")
-        )
+        try:
+            embed, file = await board.save_embed(
+                self.bot,
+                message.embeds[0].title.replace("drawing board.", "masterpiece ✨"),
+            )
+        except (RenderError, asyncio.TimeoutError):
+            return await ctx.reply("That drawing could not be saved, please try again.")
+        await ctx.reply(embed=embed, file=file)
+
+    @draw.command(
+        name="timelapse",
+        brief="Make a timelapse of a drawing.",
+        help="Make an animated timelapse of an active drawing by replying to its message or using its message link, or of your latest drawing in this channel.",
+        description="Make an animated timelapse of an active drawing.",
+    )
+    async def timelapse(
+        self, ctx: CustomContext, message_link: Optional[str] = None
+    ):
+        message = None
+        if message_link is not None:
+            with contextlib.suppress(commands.BadArgument, discord.HTTPException):
+                message = await commands.MessageConverter().convert(ctx, message_link)
+        if ref := ctx.message.reference:
+            message = ref.resolved
+
+        # Only active boards still have their history
+        views = [
+            view
+            for view in DrawView.instances
+            if not view.is_finished() and view.response is not None
+        ]
+        if isinstance(message, discord.Message):
+            views = [view for view in views if view.response.id == message.id]
+        else:
+            views = [
+                view
+                for view in views
+                if view.ctx.author == ctx.author and view.ctx.channel == ctx.channel
+            ]
+        if not views:
+            return await ctx.reply(
+                "No active drawing found. Timelapses can only be made of drawings that haven't timed out or been stopped."
+            )
+        view = max(views, key=lambda view: view.response.id)
+
+        async with ctx.typing():
+            limit = (
+                ctx.guild.filesize_limit
+                if ctx.guild is not None
+                else DEFAULT_FILESIZE_LIMIT
+            )
+            try:
+                file = await view.board.timelapse_file(limit=limit)
+            except (TimelapseTooLargeError, asyncio.TimeoutError):
+                return await ctx.reply(
+                    "The timelapse of this drawing is too large to upload."
+                )
+            except RenderError:
+                return await ctx.reply(
+                    "The timelapse of this drawing could not be made, please try again."
+                )
+
+        embed = self.bot.Embed(title=file.filename)
+        embed.set_author(name=f"{view.ctx.author}'s timelapse ✨")
+        embed.set_image(url=f"attachment://{file.filename}")
         await ctx.reply(embed=embed, file=file)
 
+    @commands.is_owner()
+    @draw.command(
+        name="prefetch",
+        brief="Store the emoji images used for rendering.",
+        help="Download and store the images of the base palette and the emojis of the colour emoji servers, so that rendering does not depend on the emoji CDNs.",
+        hidden=True,
+    )
+    async def prefetch(self, ctx: CustomContext):
+        async with ctx.typing():
+            emojis: List[Union[str, int]] = [
+                option.value for option in base_colour_options()
+            ]
+            for guild in self.bot.EMOJI_SERVERS:
+                emojis.extend(emoji.id for emoji in await guild.fetch_emojis())
+
+            fetched, missing = await self.bot.loop.run_in_executor(
+                None, EMOJI_STORE.prefetch, emojis
+            )
+
+        await ctx.send(
+            f"Stored `{len(fetched)}` new emoji image(s) in `{EMOJI_STORE.directory}`."
+            + (
+                f" `{len(missing)}` could not be found: {', '.join(map(str, missing))}"[
+                    :EMBED_FIELD_CHAR_LIMIT
+                ]
+                if missing
+                else ""
+            )
+        )
+
+    @commands.is_owner()
+    @draw.command(
+        name="stats",
+        brief="Show stats of the active drawing boards.",
+        help="Show the REST calls made and skipped by each active drawing board, and the state of the colour emoji servers.",
+        hidden=True,
+    )
+    async def stats(self, ctx: CustomContext):
+        views = [view for view in DrawView.instances if not view.is_finished()]
+        made = sum((view.rest_calls for view in views), Counter())
+        skipped = sum((view.rest_calls_skipped for view in views), Counter())
+
+        embed = self.bot.Embed(title="Draw stats")
+        embed.add_field(name="Active boards", value=len(views), inline=False)
+        embed.add_field(
+            name="REST calls (made / skipped)",
+            value="\n".join(
+                f"- `{call}`: `{made[call]}` / `{skipped[call]}`"
+                for call in sorted(made.keys() | skipped.keys())
+            )
+            or "None",
+            inline=False,
+        )
+        embed.add_field(
+            name="Boards",
+            value=(
+                "\n".join(
+                    f"- {view.ctx.author} in {view.ctx.channel.mention}: `{sum(view.rest_calls.values())}` / `{sum(view.rest_calls_skipped.values())}`"
+                    for view in views
+                )
+                or "None"
+            )[:EMBED_FIELD_CHAR_LIMIT],
+            inline=False,
+        )
+        embed.add_field(
+            name="Colour emoji slots",
+            value=f"`{self.bot.emoji_pool.free_slots()}` free",
+            inline=False,
+        )
+        embed.add_field(
+            name="Render pool",
+            value=(
+                f"`{RENDERER.processes}` process(es), `{RENDERER.depth}` queued (max `{RENDERER.max_depth}`), "
+                f"`{RENDERER.average_time:.2f}s` average\n"
+                + ", ".join(f"`{outcome}`: `{count}`" for outcome, count in RENDERER.stats.items())
+            ),
+            inline=False,
+        )
+        embed.add_field(
+            name="Emoji colour cache",
+            value=(
+                f"`{len(COLOUR_ANALYZER.cache)}/{COLOUR_ANALYZER.cache.maxsize}` cached, "
+                f"`{COLOUR_ANALYZER.hit_rate:.0%}` hit rate "
+                f"(`{COLOUR_ANALYZER.stats['hits']}` hits, `{COLOUR_ANALYZER.stats['shared']}` shared, `{COLOUR_ANALYZER.stats['misses']}` misses)"
+            ),
+            inline=False,
+        )
+        session_store = self.bot.session_store
+        embed.add_field(
+            name="Draw sessions",
+            value=(
+                (
+                    f"`{len(session_store.dirty)}` to be written, "
+                    + ", ".join(f"`{stat}`: `{count}`" for stat, count in session_store.stats.items())
+                )
+                if session_store.enabled
+                else "Not persisted"
+            ),
+            inline=False,
+        )
+        await ctx.send(embed=embed)
+
 
 async def setup(bot):
     await bot.add_cog(Draw(bot))
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import io
+import threading
+from typing import Optional, Sequence, Tuple, Union
+
+import discord
+import numpy as np
+from cachetools import LRUCache
+from PIL import Image
+from pilmoji.source import BaseSource
+
+from .constants import ATLAS_MAX_TILES, EMOJI_SIZE, LINE_SPACING, NODE_SPACING
+from .emoji_store import EMOJI_STORE
+
+
+class TileAtlas:
+    """Rasterizes each distinct emoji once into an RGBA tile, and composes
+    board images by pasting those tiles instead of rendering the board as text"""
+
+    def __init__(
+        self,
+        *,
+        source: Optional[BaseSource] = None,
+        max_tiles: Optional[int] = ATLAS_MAX_TILES,
+    ):
+        self.source: BaseSource = source or EMOJI_STORE
+        self.tiles: LRUCache[Tuple[Union[int, str], int], Image.Image] = LRUCache(
+            maxsize=max_tiles
+        )
+        # Boards are saved in executor threads, and the cache is not thread-safe
+        self.lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} tiles={len(self.tiles)}/{self.tiles.maxsize} source={self.source!r}>"
+
+    @staticmethod
+    def key(emoji: str) -> Union[int, str]:
+        """Custom emojis are keyed by their ID, so that the same emoji under different names shares a tile"""
+
+        partial_emoji = discord.PartialEmoji.from_str(emoji)
+        return partial_emoji.id if partial_emoji.is_custom_emoji() else emoji
+
+    def rasterize(self, key: Union[int, str], size: int) -> Image.Image:
+        """Renders an emoji into a tile the same way Pilmoji renders it in text"""
+
+        if isinstance(key, int):
+            stream = self.source.get_discord_emoji(key)
+        else:
+            stream = self.source.get_emoji(key)
+
+        if stream is None:
+            return Image.new("RGBA", (size, size), (255, 255, 255, 0))
+
+        with Image.open(stream) as asset:
+            asset = asset.convert("RGBA")
+            return asset.resize(
+                (size, round(np.ceil(asset.height / asset.width * size))),
+                Image.Resampling.LANCZOS,
+            )
+
+    def tile(self, emoji: str, *, size: Optional[int] = EMOJI_SIZE) -> Image.Image:
+        key = (self.key(emoji), size)
+        with self.lock:
+            tile = self.tiles.get(key)
+        if tile is None:
+            tile = self.rasterize(key[0], size)
+            with self.lock:
+                self.tiles[key] = tile
+        return tile
+
+    @staticmethod
+    def steps(size: int) -> Tuple[int, int]:
+        """Returns the horizontal and vertical distance between tiles of a size,
+        scaling the spacing that Pilmoji uses when rendering the board as text"""
+
+        scale = size / EMOJI_SIZE
+        # Each emoji is followed by a zero-width space, both of which are spaced by NODE_SPACING
+        return (
+            size + round(NODE_SPACING * 2 * scale),
+            size + round(LINE_SPACING * scale),
+        )
+
+    def compose(
+        self,
+        pixels: np.ndarray,
+        emojis: Sequence[str],
+        *,
+        size: Optional[int] = EMOJI_SIZE,
+    ) -> Image.Image:
+        """Composes an image of a board from its palette-index array and palette emojis"""
+
+        height, width = pixels.shape
+        x_step, y_step = self.steps(size)
+
+        w = width * x_step - (x_step - size)
+        h = height * y_step - (y_step - size)
+        image = Image.new("RGBA", (w, h), (255, 255, 255, 0))
+
+        tiles = {
+            index: self.tile(emojis[index], size=size)
+            for index in np.unique(pixels).tolist()
+        }
+        for (row, col), index in np.ndenumerate(pixels):
+            tile = tiles[index]
+            image.paste(tile, (col * x_step, row * y_step), tile)
+        return image
+
+
+TILE_ATLAS = TileAtlas()
+
+
+def fit_size(shape: Tuple[int, int], *, max_size: int, size: int) -> int:
+    """Returns the largest tile size, at most size, with which a board
+    of a shape composes into an image of at most max_size pixels a side"""
+
+    return max(min(size, max_size // max(shape)), 1)
+
+
+def render_board(
+    pixels: np.ndarray, emojis: Sequence[str], size: Optional[int] = EMOJI_SIZE
+) -> bytes:
+    """The PNG of a board. A render job, so it can run in a worker process."""
+
+    image = TILE_ATLAS.compose(pixels, emojis, size=size)
+    with io.BytesIO() as buffer:
+        image.save(buffer, "PNG")
+        return buffer.getvalue()
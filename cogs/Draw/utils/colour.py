@@ -1,20 +1,85 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 from functools import cached_property
 import io
-from typing import Optional, Union, List, Tuple
+import threading
+from typing import Dict, Optional, Union, List, Tuple
 
 import numpy as np
 import discord
+from cachetools import LRUCache
 from PIL import Image
 
 
 from .emoji import draw_emoji
+from .colour_analysis import COLOUR_ANALYZER
+from .constants import IMPORT_MAX_BYTES, PNG_CACHE_SIZE
+from .errors import ImageTooLargeError
+from .quantize import extract_palette
+from .renderer import RENDERER
 
 from .regexes import HEX_REGEX
 
 
+BASE_EMOJI = "🟪"
+
+# The fully recoloured PNG of each colour emoji, by hex
+PNG_CACHE: LRUCache[str, bytes] = LRUCache(maxsize=PNG_CACHE_SIZE)
+PNG_CACHE_LOCK = threading.Lock()
+
+# Reused buffers to recolour the templates into, by shape
+TEMPLATE_BUFFERS: Dict[Tuple[int, int], np.ndarray] = {}
+TEMPLATE_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=8)
+def alpha_template(base_emoji: str) -> np.ndarray:
+    """The alpha channel of a rendered base emoji, which is all that recolouring needs"""
+
+    alpha = np.array(draw_emoji(base_emoji).getchannel("A"))
+    alpha.setflags(write=False)
+    return alpha
+
+
+def recolour(RGBA: Tuple[int, int, int, int], base_emoji: Optional[str] = None) -> Image:
+    # If you pass in an emoji, it uses that as base
+    # Else it uses 🟪
+    alpha = alpha_template(base_emoji or BASE_EMOJI)
+    with TEMPLATE_LOCK:
+        buffer = TEMPLATE_BUFFERS.get(alpha.shape)
+        if buffer is None:
+            buffer = TEMPLATE_BUFFERS[alpha.shape] = np.empty(
+                (*alpha.shape, 4), dtype=np.uint8
+            )
+
+        buffer[..., :3] = RGBA[:3]
+        # Set the alpha relatively, to respect individual alpha values
+        np.multiply(alpha, RGBA[3] / 255, out=buffer[..., 3], casting="unsafe")
+
+        # frombytes copies the buffer, so it can be reused
+        return Image.frombytes("RGBA", alpha.shape[::-1], buffer.tobytes())
+
+
+def colour_to_png(RGBA: Tuple[int, int, int, int]) -> bytes:
+    """The PNG of a colour emoji. A render job, so it can run in a worker process."""
+
+    hex = "%02x%02x%02x%02x" % tuple(RGBA)
+    with PNG_CACHE_LOCK:
+        image_bytes = PNG_CACHE.get(hex)
+    if image_bytes is not None:
+        return image_bytes
+
+    with io.BytesIO() as buffer:
+        recolour(RGBA).save(buffer, "PNG")
+        image_bytes = buffer.getvalue()
+
+    with PNG_CACHE_LOCK:
+        PNG_CACHE[hex] = image_bytes
+    return image_bytes
+
+
 class Colour:
     # RGB_A accepts RGB values and an optional Alpha value
     def __init__(self, RGB_A: Tuple[int, int, int, Optional[int]]):
@@ -28,22 +93,20 @@ class Colour:
     def hex(self) -> str:
         return "%02x%02x%02x%02x" % self.RGBA
 
-    @cached_property
-    def base_emoji(self) -> Image:
-        return draw_emoji("🟪")
-
     async def to_bytes(self) -> bytes:
-        return await self.loop.run_in_executor(None, self._to_bytes)
+        with PNG_CACHE_LOCK:
+            image_bytes = PNG_CACHE.get(self.hex)
+        if image_bytes is None:
+            image_bytes = await RENDERER.run(colour_to_png, self.RGBA)
+            with PNG_CACHE_LOCK:
+                PNG_CACHE[self.hex] = image_bytes
+        return image_bytes
 
     def _to_bytes(self) -> bytes:
-        image = self._to_image()
-        with io.BytesIO() as image_bytes:
-            image.save(image_bytes, "PNG")
-            # image_bytes.seek(0)
-            return image_bytes.getvalue()
+        return colour_to_png(self.RGBA)
 
     async def to_file(self) -> discord.File:
-        return await self.loop.run_in_executor(None, self._to_file)
+        return discord.File(io.BytesIO(await self.to_bytes()), filename=f"{self.hex}.png")
 
     def _to_file(self) -> discord.File:
         image_bytes = io.BytesIO(self._to_bytes())
@@ -53,21 +116,7 @@ class Colour:
         return await self.loop.run_in_executor(None, self._to_image, base_emoji)
 
     def _to_image(self, base_emoji: Optional[str] = None) -> Image:
-        # If you pass in an emoji, it uses that as base
-        # Else it uses the base_emoji property which uses 🟪
-        base_emoji = draw_emoji(base_emoji) if base_emoji else self.base_emoji
-        data = np.array(base_emoji)
-        r, g, b, a = data.T
-
-        data[..., :-1][a != 0] = self.RGB
-
-        # Set the alpha relatively, to respect individual alpha values
-        alpha_percent = self.A / 255
-        data[..., -1] = alpha_percent * data[..., -1]
-
-        image = Image.fromarray(data)
-
-        return image
+        return recolour(self.RGBA, base_emoji)
 
     async def to_emoji(self, guild: discord.Guild):
         return await guild.create_custom_emoji(
@@ -78,42 +127,23 @@ class Colour:
     async def from_emoji(
         cls, emoji: Union[str, discord.Emoji, discord.PartialEmoji]
     ) -> Colour:
-        if isinstance(emoji, str):
-            emoji: discord.PartialEmoji = discord.PartialEmoji.from_str(emoji)
-        loop = asyncio.get_running_loop()
-        image = await loop.run_in_executor(None, draw_emoji, str(emoji))
-        colours = [
-            colour
-            for colour in sorted(
-                image.getcolors(image.size[0] * image.size[1]),
-                key=lambda c: c[0],
-                reverse=True,
-            )
-            if colour[-1][-1] != 0
-        ]
-
-        return cls(colours[0][1])
+        return cls(await COLOUR_ANALYZER.dominant(emoji))
 
     @classmethod
     async def from_attachment(
         cls, attachment: discord.Attachment, *, n_colours: Optional[int] = 5
-    ) -> Colour:
-        image = Image.open(io.BytesIO(await attachment.read()))
-        colours: Tuple[int, Tuple[int, int, int]] = [
-            colour
-            for colour in sorted(
-                image.getcolors(image.size[0] * image.size[1]),
-                key=lambda c: c[0],
-                reverse=True,
-            )
-            if colour[-1][-1] != 0
-        ]
-
-        colour_objs = []
-        for i in range(n_colours):
-            colour_objs.append(cls(colours[min(len(colours), i)][-1]))
+    ) -> List[Tuple[Colour, float]]:
+        """Returns the most used, perceptually distinct colours of an image attachment,
+        with the share of the image's visible pixels each one covers"""
 
-        return colour_objs
+        if attachment.size > IMPORT_MAX_BYTES:
+            raise ImageTooLargeError(
+                f"Attachment is {attachment.size} bytes, which is more than {IMPORT_MAX_BYTES}"
+            )
+        palette = await RENDERER.run(
+            extract_palette, await attachment.read(), n_colours
+        )
+        return [(cls(RGBA), share) for RGBA, share in palette]
 
     @classmethod
     def from_hex(cls, hex: str) -> Colour:
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import typing
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple, Union
+
+import discord
+import numpy as np
+from cachetools import LRUCache
+
+from .atlas import TILE_ATLAS, TileAtlas
+from .constants import COLOUR_ANALYSIS_WORKERS, COLOUR_CACHE_SIZE
+
+
+RGBA = Tuple[int, int, int, int]
+
+
+def dominant_colour(pixels: np.ndarray) -> Optional[RGBA]:
+    """Returns the most common colour of an RGBA pixel array, ignoring fully transparent pixels"""
+
+    pixels = pixels.reshape(-1, 4)
+    pixels = pixels[pixels[:, 3] != 0]
+    if pixels.size == 0:
+        return None
+
+    # Pack each pixel into a single integer so that unique works on scalars
+    packed = np.ascontiguousarray(pixels, dtype=np.uint8).view(np.uint32).ravel()
+    values, counts = np.unique(packed, return_counts=True)
+    dominant = np.array([values[counts.argmax()]], dtype=np.uint32)
+    return tuple(dominant.view(np.uint8).tolist())
+
+
+class ColourAnalyzer:
+    """Finds the dominant colour of emojis, remembering the results.
+
+    Results are kept in an LRU cache keyed by the emoji's ID, or the emoji itself if it
+    is a unicode emoji. Concurrent lookups of the same emoji share a single analysis,
+    which runs on its own executor so that it doesn't queue behind other executor work.
+    """
+
+    def __init__(
+        self,
+        *,
+        atlas: Optional[TileAtlas] = None,
+        max_size: Optional[int] = COLOUR_CACHE_SIZE,
+        workers: Optional[int] = COLOUR_ANALYSIS_WORKERS,
+    ):
+        self.atlas: TileAtlas = atlas or TILE_ATLAS
+        self.cache: LRUCache[Union[int, str], RGBA] = LRUCache(maxsize=max_size)
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="colour-analysis"
+        )
+        # In-flight analyses by key
+        self.pending: Dict[Union[int, str], asyncio.Future] = {}
+        # Number of lookups that were cache hits, shared an in-flight analysis or were analysed
+        self.stats: typing.Counter[str] = Counter()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} cached={len(self.cache)}/{self.cache.maxsize} hit_rate={self.hit_rate:.0%}>"
+
+    @property
+    def hit_rate(self) -> float:
+        total = sum(self.stats.values())
+        return (total - self.stats["misses"]) / total if total else 0.0
+
+    def analyse(self, key: Union[int, str]) -> RGBA:
+        emoji = f"<:_:{key}>" if isinstance(key, int) else key
+        tile = self.atlas.tile(emoji)
+        colour = dominant_colour(np.asarray(tile.convert("RGBA")))
+        if colour is None:
+            raise ValueError(f"Emoji {emoji} has no visible colour")
+        return colour
+
+    async def dominant(
+        self, emoji: Union[str, discord.Emoji, discord.PartialEmoji]
+    ) -> RGBA:
+        """Returns the dominant RGBA colour of an emoji"""
+
+        if not isinstance(emoji, str):
+            emoji = str(emoji)
+        key = self.atlas.key(emoji)
+
+        if (colour := self.cache.get(key)) is not None:
+            self.stats["hits"] += 1
+            return colour
+
+        if (future := self.pending.get(key)) is not None:
+            self.stats["shared"] += 1
+            return await asyncio.shield(future)
+
+        self.stats["misses"] += 1
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, self.analyse, key)
+        self.pending[key] = future
+        future.add_done_callback(lambda future: self.finish(key, future))
+        # Shield it so that one caller being cancelled does not cancel it for the others
+        return await asyncio.shield(future)
+
+    def finish(self, key: Union[int, str], future: asyncio.Future):
+        self.pending.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self.cache[key] = future.result()
+
+    def clear(self):
+        self.cache.clear()
+        self.stats.clear()
+
+
+COLOUR_ANALYZER = ColourAnalyzer()
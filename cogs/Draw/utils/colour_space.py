@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+# sRGB (D65) to CIE XYZ
+RGB_TO_XYZ = np.array(
+    [
+        [0.4124564, 0.3575761, 0.1804375],
+        [0.2126729, 0.7151522, 0.0721750],
+        [0.0193339, 0.1191920, 0.9503041],
+    ]
+)
+XYZ_TO_RGB = np.linalg.inv(RGB_TO_XYZ)
+WHITE = RGB_TO_XYZ.sum(axis=1)
+DELTA = 6 / 29
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """Converts an (..., 3) array of 0-255 sRGB values to CIELAB"""
+
+    c = np.asarray(rgb, dtype=np.float64) / 255
+    linear = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ RGB_TO_XYZ.T / WHITE
+    f = np.where(xyz > DELTA**3, np.cbrt(xyz), xyz / (3 * DELTA**2) + 4 / 29)
+    return np.stack(
+        (
+            116 * f[..., 1] - 16,
+            500 * (f[..., 0] - f[..., 1]),
+            200 * (f[..., 1] - f[..., 2]),
+        ),
+        axis=-1,
+    )
+
+
+def lab_to_rgb(lab: np.ndarray) -> np.ndarray:
+    """Converts an (..., 3) array of CIELAB values to 0-255 sRGB values, clipping out of gamut ones"""
+
+    lab = np.asarray(lab, dtype=np.float64)
+    fy = (lab[..., 0] + 16) / 116
+    f = np.stack((fy + lab[..., 1] / 500, fy, fy - lab[..., 2] / 200), axis=-1)
+    xyz = np.where(f > DELTA, f**3, 3 * DELTA**2 * (f - 4 / 29)) * WHITE
+    linear = np.clip(xyz @ XYZ_TO_RGB.T, 0, 1)
+    c = np.where(
+        linear <= 0.0031308, linear * 12.92, 1.055 * linear ** (1 / 2.4) - 0.055
+    )
+    return np.round(c * 255).astype(np.uint8)
@@ -1,13 +1,17 @@
+import os
 from typing import Optional
 from PIL import ImageFont
 
 import discord
 
-from helpers.constants import u200b
+from helpers.constants import GITHUB_REPO, u200b
 from helpers.utils import invert_dict
 
 
 SAVE_FILENAME = "drawing"
+# The encoded state of a board is stored in the fragment of its embed's URL
+BOARD_STATE_URL = f"{GITHUB_REPO}#draw="
+EMBED_URL_LIMIT = 2048
 
 TRANSPARENT_EMOJI = "<:e:1104930506698653706>"
 TRANSPARENT_CURSOR_EMOJI = "<:tc:1104939609240113162>"
@@ -32,6 +36,14 @@ def base_colour_options():
 
 MIN_HEIGHT_OR_WIDTH = 5
 MAX_HEIGHT_OR_WIDTH = 17
+VIEWPORT_SIZE = 17  # Number of rows and columns of a board shown in the embed at once
+VIEWPORT_TEXT_PREFIX = "Viewing"  # Start of the footer of boards larger than the viewport
+MAX_CANVAS_SIZE = 128  # Largest height or width of a board, boards larger than the viewport scroll
+CANVAS_SIZE_OPTIONS = (24, 32, 48, 64, 96, 128)  # Sizes larger than the viewport offered when creating a board
+
+HISTORY_MAX_BYTES = 64 * 1024  # Memory budget of a board's undo/redo history
+HISTORY_KEYFRAME_INTERVAL = 32  # Number of history steps between full board copies
+EDIT_COALESCE_DELAY = 0.3  # Minimum seconds between edits of a draw message, edits requested meanwhile are coalesced
 
 
 def base_number_options(prefix: Optional[str] = ""):
@@ -39,7 +51,7 @@ def base_number_options(prefix: Optional[str] = ""):
         discord.SelectOption(
             label=f"{f'{prefix} = ' if prefix else prefix}{n}", value=str(n)
         )
-        for n in range(MIN_HEIGHT_OR_WIDTH, MAX_HEIGHT_OR_WIDTH + 1)
+        for n in (*range(MIN_HEIGHT_OR_WIDTH, MAX_HEIGHT_OR_WIDTH + 1), *CANVAS_SIZE_OPTIONS)
     ]
 
 
@@ -159,4 +171,53 @@ NUMBERS = tuple(LETTER_TO_NUMBER.values())
 
 FONT = lambda size: ImageFont.truetype("helpers/fonts/arial.ttf", size)
 
+EMOJI_SIZE = 128  # Size of each emoji in saved images
+SAVE_MAX_SIZE = 4096  # Largest width or height of a saved image, large boards are saved with smaller emojis
+LINE_SPACING = -4  # Spacing between rows of emojis in saved images
+NODE_SPACING = -2  # Spacing between emojis in the same row in saved images
+ATLAS_MAX_TILES = 512  # Number of rasterized emoji tiles to keep cached
+COLOUR_CACHE_SIZE = 1024  # Number of emojis whose dominant colour is kept cached
+COLOUR_ANALYSIS_WORKERS = 2  # Number of threads that find the dominant colour of emojis
+PNG_CACHE_SIZE = 256  # Number of encoded colour emoji images to keep cached
+SNAP_GRID_STEP = 4.0  # Distance between the points of the CIELAB grid colours snap to in grid mode
+SNAP_MAX_DELTA_E = 4.0  # Maximum ΔE between a colour and the existing colour emoji it snaps to in emoji mode
+
+# Directory where emoji images are stored for rendering, so that they are only downloaded once
+EMOJI_STORE_DIR = os.getenv("DRAW_EMOJI_STORE_DIR", "cache/emojis")
+# If set, emoji images are only ever read from the store and never downloaded
+EMOJI_STORE_OFFLINE = bool(os.getenv("DRAW_EMOJI_STORE_OFFLINE"))
+# File where the last-used timestamps of colour emojis are saved across restarts
+EMOJI_USAGE_FILE = os.getenv("DRAW_EMOJI_USAGE_FILE", "cache/emoji_usage.json")
+# Number of worker processes that render saved boards and colour emojis, 0 to use threads instead
+RENDER_PROCESSES = int(os.getenv("DRAW_RENDER_PROCESSES", 2))
+RENDER_TIMEOUT = 30  # Seconds after which a render job is given up on
+
+TIMELAPSE_TILE_SIZE = 24  # Size of each emoji in timelapse frames
+TIMELAPSE_MAX_SIZE = 1024  # Largest width or height of timelapse frames, large boards get smaller emojis
+TIMELAPSE_MIN_TILE_SIZE = 6  # Smallest size emojis are shrunk to for a timelapse to fit the upload limit
+TIMELAPSE_MAX_FRAMES = 150
+TIMELAPSE_DURATION = 6000  # Milliseconds the timelapse takes, and the last frame is held for
+TIMELAPSE_BACKGROUND = (49, 51, 56, 255)  # Discord's dark theme, since GIFs don't do partial transparency
+TIMELAPSE_FILENAME = "timelapse"
+IMPORT_MAX_BYTES = 16 * 1024 * 1024  # Largest image file that can be imported
+IMPORT_MAX_PIXELS = 40_000_000  # Largest image, by its number of pixels, that can be decoded for importing
+IMPORT_ALPHA_THRESHOLD = 128  # Alpha below which a pixel of an imported image is left as the background
+IMPORT_DEFAULT_COLOURS = 12
+IMPORT_MAX_COLOURS = 32
+PALETTE_SAMPLE_SIZE = 128  # Size images are sampled down to before their colours are extracted
+PALETTE_MIN_DELTA_E = 10.0  # Minimum ΔE between colours extracted from an image
+# Postgres database draw sessions are persisted to, for them to be resumed. Not persisted if unset
+DATABASE_URL = os.getenv("DATABASE_URL")
+SESSION_SCHEMA_FILE = "schema.sql"  # Creates the table of draw sessions if it doesn't exist yet
+SESSION_FLUSH_INTERVAL = 5  # Seconds between writes of changed draw sessions, changes meanwhile are coalesced
+SESSION_MAX_AGE = 7 * 24 * 60 * 60  # Seconds after their last change that draw sessions are deleted
+SESSION_PRUNE_INTERVAL = 60 * 60  # Seconds between deletions of old draw sessions
+KMEANS_ITERATIONS = 20  # Maximum number of iterations when clustering colours
+PREVIEW_TILE_SIZE = 32  # Size of each emoji in the image previews of boards
+PREVIEW_MAX_SIZE = 1024  # Largest width or height of a preview, large boards get smaller emojis
+PREVIEW_CURSOR_COLOURS = ((255, 255, 255, 255), (0, 0, 0, 255))  # Outlines of the cursors in previews, outermost first
+PREVIEW_FILENAME = "board"
+DEFAULT_FILESIZE_LIMIT = 10 * 1024 * 1024  # Upload limit outside of guilds
+EMOJI_UPLOADS_PER_GUILD = 1  # Number of colour emojis that can be created at once in each emoji server
+
 PADDING = (" " + u200b) * 6
@@ -5,6 +5,7 @@ from PIL import Image
 from pilmoji import Pilmoji
 
 from .constants import FONT
+from .emoji_store import EMOJI_STORE
 
 
 ADD_EMOJIS_EMOJI = "<:emojismiley:1056857231125123152>"
@@ -14,11 +15,13 @@ MIX_COLOURS_EMOJI = "🔀"
 AUTO_DRAW_EMOJI = "<:auto_draw:1032565224903016449>"
 SELECT_EMOJI = "<:select_tool:1037847279169704028>"
 SAVE_EMOJI = "<:save:1105025339861766195>"
+TIMELAPSE_EMOJI = "🎞️"
+PREVIEW_EMOJI = "🖼️"
 
 
 def draw_emoji(emoji: str) -> Image:
     with Image.new("RGBA", (128, 128), (255, 255, 255, 0)) as image:
-        with Pilmoji(image) as pilmoji:
+        with Pilmoji(image, source=EMOJI_STORE) as pilmoji:
             pilmoji.text(
                 xy=(0, 0),
                 text=emoji,
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import typing
 import discord
 
-from typing import Dict, Optional, Union, List
+from typing import Dict, Iterable, Optional, Union, List
 
 
 if typing.TYPE_CHECKING:
@@ -11,10 +12,21 @@ if typing.TYPE_CHECKING:
 
 
 class EmojiCache:
+    """Registry of the colour emojis on the emoji servers, indexed by both name (hex) and ID.
+
+    It is populated once at startup and then kept consistent through guild emoji update events,
+    so that looking up a colour emoji never needs an HTTP request.
+    """
+
     def __init__(self, *, bot: Bot) -> None:
         self.bot = bot
 
         self.cache: Dict[str, Union[discord.Emoji, discord.PartialEmoji]] = {}
+        self.ids: Dict[int, Union[discord.Emoji, discord.PartialEmoji]] = {}
+        # The emojis of each emoji server, by guild ID and then emoji ID
+        self.guild_emojis: Dict[int, Dict[int, discord.Emoji]] = {}
+        # Incremented on every change, so that anything derived from the cache knows when to update
+        self.version: int = 0
 
     def get_emoji(
         self, name: str
@@ -24,13 +36,14 @@ class EmojiCache:
     def get_emoji_from_id(
         self, id: int
     ) -> Optional[Union[discord.Emoji, discord.PartialEmoji]]:
-        for name, emoji in self.cache.items():
-            if emoji.id == id:
-                return emoji
-        return None
+        return self.ids.get(id)
 
     def add_emoji(self, emoji: Union[discord.Emoji, discord.PartialEmoji]) -> None:
-        self.cache[emoji.name] = emoji
+        self.version += 1
+        self.cache.setdefault(emoji.name, emoji)
+        self.ids[emoji.id] = emoji
+        if (guild_id := getattr(emoji, "guild_id", None)) is not None:
+            self.guild_emojis.setdefault(guild_id, {})[emoji.id] = emoji
 
     def add_emojis(
         self, emoji_list: List[Union[discord.Emoji, discord.PartialEmoji]]
@@ -39,15 +52,43 @@ class EmojiCache:
             self.add_emoji(emoji)
 
     def remove_emoji(self, emoji: Union[discord.Emoji, discord.PartialEmoji]) -> bool:
-        for name, emoji_cache in self.cache.items():
-            if emoji is emoji_cache:
-                del self.cache[name]
-                return True
-        else:
-            if emoji.name in self.cache:
-                del self.cache[emoji.name]
-                return True
-        return False
+        self.version += 1
+        cached_emoji = self.ids.pop(emoji.id, None)
+        if (guild_id := getattr(emoji, "guild_id", None)) is not None:
+            self.guild_emojis.get(guild_id, {}).pop(emoji.id, None)
+
+        if (named_emoji := self.cache.get(emoji.name)) is not None and (
+            named_emoji.id == emoji.id
+        ):
+            del self.cache[emoji.name]
+            # Another server may have an emoji with the same name
+            for other_emoji in self.ids.values():
+                if other_emoji.name == emoji.name:
+                    self.cache[emoji.name] = other_emoji
+                    break
+        return cached_emoji is not None
+
+    def set_guild_emojis(
+        self, guild: Union[discord.Guild, int], emojis: Iterable[discord.Emoji]
+    ) -> None:
+        """Replaces all the cached emojis of a guild"""
+
+        guild_id = guild if isinstance(guild, int) else guild.id
+        for emoji in list(self.guild_emojis.get(guild_id, {}).values()):
+            self.remove_emoji(emoji)
+        self.guild_emojis[guild_id] = {}
+        self.add_emojis(list(emojis))
+
+    async def populate(self, guilds: Iterable[discord.Guild]) -> None:
+        """Fetches the emojis of all the guilds at once and caches them"""
+
+        guilds = list(guilds)
+        guild_emojis = await asyncio.gather(*(guild.fetch_emojis() for guild in guilds))
+        for guild, emojis in zip(guilds, guild_emojis):
+            self.set_guild_emojis(guild, emojis)
 
     def clear(self) -> None:
+        self.version += 1
         self.cache.clear()
+        self.ids.clear()
+        self.guild_emojis.clear()
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+import typing
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+import discord
+
+from .constants import EMOJI_UPLOADS_PER_GUILD, EMOJI_USAGE_FILE
+from .errors import EmojiPoolFullError
+from .regexes import HEX_REGEX
+
+if typing.TYPE_CHECKING:
+    from main import Bot
+    from .colour import Colour
+    from .emoji_cache import EmojiCache
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmojiPool:
+    """Manages the slots of the colour emoji servers.
+
+    It tracks the free static emoji slots of each server and when each colour emoji
+    was last drawn with, so that when every server is full, the least recently used
+    colour emoji is the one deleted. Usage is saved to disk to survive restarts.
+
+    Colour emojis are created through it, with concurrent requests for the same hex sharing
+    a single upload, and creates spread across the servers with a per-server concurrency limit,
+    since each server has its own emoji rate limit bucket.
+    """
+
+    def __init__(self, *, bot: Bot, path: Optional[str] = EMOJI_USAGE_FILE):
+        self.bot = bot
+        self.path: str = path
+
+        # Timestamps of when each colour emoji was last used, by emoji ID
+        self.last_used: Dict[int, float] = {}
+        self.dirty: bool = False
+
+        # In-flight uploads by hex
+        self.uploads: Dict[str, asyncio.Task] = {}
+        # Slots of each guild that are taken by in-flight uploads, by guild ID
+        self.reserved: Dict[int, int] = {}
+        self.semaphores: Dict[int, asyncio.Semaphore] = {}
+        self.evict_lock = asyncio.Lock()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} tracked={len(self.last_used)} free_slots={self.free_slots()}>"
+
+    @property
+    def cache(self) -> EmojiCache:
+        return self.bot.emoji_cache
+
+    @property
+    def guilds(self) -> List[discord.Guild]:
+        return self.bot.EMOJI_SERVERS
+
+    def free_slots(self, guild: Optional[discord.Guild] = None) -> int:
+        """The number of free static emoji slots of a guild, or of all guilds if None"""
+
+        if guild is None:
+            return sum(self.free_slots(guild) for guild in self.guilds)
+
+        emojis = self.cache.guild_emojis.get(guild.id, {}).values()
+        return (
+            guild.emoji_limit
+            - sum(not emoji.animated for emoji in emojis)
+            - self.reserved.get(guild.id, 0)
+        )
+
+    def guild_with_space(
+        self, *, exclude: Set[int] = frozenset()
+    ) -> Optional[discord.Guild]:
+        """Returns the guild with the most free slots, if any has a free slot,
+        excluding some guild IDs"""
+
+        guilds = [guild for guild in self.guilds if guild.id not in exclude]
+        guild = max(guilds, key=self.free_slots, default=None)
+        if guild is None or self.free_slots(guild) <= 0:
+            return None
+        return guild
+
+    def reserve(self, *, exclude: Set[int]) -> Optional[discord.Guild]:
+        """Reserves a slot in the guild with the most free slots, excluding some guild IDs"""
+
+        guild = self.guild_with_space(exclude=exclude)
+        if guild is None:
+            return None
+        self.reserved[guild.id] = self.reserved.get(guild.id, 0) + 1
+        return guild
+
+    def release(self, guild: discord.Guild):
+        self.reserved[guild.id] -= 1
+
+    async def create(self, colour: Colour) -> discord.Emoji:
+        """Returns the colour emoji of a colour, creating it if it does not exist.
+        Concurrent calls for the same colour share a single upload."""
+
+        if (emoji := self.cache.get_emoji(colour.hex)) is not None:
+            return emoji
+
+        if (task := self.uploads.get(colour.hex)) is None:
+            task = asyncio.create_task(self._create(colour))
+            self.uploads[colour.hex] = task
+            task.add_done_callback(lambda _: self.uploads.pop(colour.hex, None))
+        # Shield it so that one caller being cancelled does not cancel it for the others
+        return await asyncio.shield(task)
+
+    async def _create(self, colour: Colour) -> discord.Emoji:
+        image = await colour.to_bytes()
+
+        # Guilds that refused to create it, which are not tried again nor evicted from
+        failed: Set[int] = set()
+        while len(failed) < len(self.guilds):
+            guild = self.reserve(exclude=failed)
+            if guild is None:
+                async with self.evict_lock:
+                    # Another upload may have already freed a slot while this one waited
+                    if (
+                        self.guild_with_space(exclude=failed) is None
+                        and await self.evict(exclude=failed) is None
+                    ):
+                        raise EmojiPoolFullError("No colour emoji slots available")
+                continue
+
+            semaphore = self.semaphores.setdefault(
+                guild.id, asyncio.Semaphore(EMOJI_UPLOADS_PER_GUILD)
+            )
+            try:
+                async with semaphore:
+                    emoji = await guild.create_custom_emoji(name=colour.hex, image=image)
+            except discord.HTTPException as error:
+                logger.warning(
+                    "Could not create the %s emoji in %s: %s", colour.hex, guild.id, error
+                )
+                failed.add(guild.id)
+                continue
+            finally:
+                self.release(guild)
+
+            self.cache.add_emoji(emoji)
+            self.touch([emoji.id])
+            return emoji
+
+        raise EmojiPoolFullError(
+            f"Could not create the {colour.hex} emoji in any emoji server"
+        )
+
+    async def upload(
+        self, colours: Iterable[Colour]
+    ) -> Dict[str, Union[discord.Emoji, Exception]]:
+        """Creates the colour emojis of multiple colours at once.
+        Returns the emoji, or the error it failed with, of each distinct hex."""
+
+        colours = {colour.hex: colour for colour in colours}
+        results = await asyncio.gather(
+            *(self.create(colour) for colour in colours.values()),
+            return_exceptions=True,
+        )
+        return dict(zip(colours.keys(), results))
+
+    def touch(self, emoji_ids: Iterable[int], *, timestamp: Optional[float] = None):
+        """Marks colour emojis as used just now"""
+
+        timestamp = timestamp or time.time()
+        for emoji_id in emoji_ids:
+            if emoji_id in self.cache.ids:
+                self.last_used[emoji_id] = timestamp
+                self.dirty = True
+
+    def colour_emojis(self) -> List[discord.Emoji]:
+        return [
+            emoji
+            for guild in self.guilds
+            for emoji in self.cache.guild_emojis.get(guild.id, {}).values()
+            if HEX_REGEX.fullmatch(emoji.name) is not None
+        ]
+
+    def least_recently_used(
+        self, *, exclude: Set[int] = frozenset()
+    ) -> Optional[discord.Emoji]:
+        # Emojis that were never seen being used are evicted first,
+        # then the ones created earliest
+        return min(
+            (emoji for emoji in self.colour_emojis() if emoji.guild_id not in exclude),
+            key=lambda emoji: (self.last_used.get(emoji.id, 0), emoji.id),
+            default=None,
+        )
+
+    async def evict(self, *, exclude: Set[int] = frozenset()) -> Optional[discord.Emoji]:
+        """Deletes the least recently used colour emoji to free a slot, excluding the emojis
+        of some guild IDs. Returns the deleted emoji."""
+
+        emoji = self.least_recently_used(exclude=exclude)
+        if emoji is None:
+            return None
+
+        await emoji.delete()
+        self.cache.remove_emoji(emoji)
+        if self.last_used.pop(emoji.id, None) is not None:
+            self.dirty = True
+        return emoji
+
+    def load(self):
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as error:
+            logger.warning("Could not load emoji usage from %s: %s", self.path, error)
+            return
+
+        self.last_used.update(
+            {int(emoji_id): timestamp for emoji_id, timestamp in data.items()}
+        )
+        # Forget emojis that no longer exist
+        for emoji_id in self.last_used.keys() - self.cache.ids.keys():
+            del self.last_used[emoji_id]
+
+    def save(self):
+        if self.dirty is False:
+            return
+
+        data = json.dumps({str(k): v for k, v in self.last_used.items()})
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            file.write(data)
+        os.replace(temp_path, self.path)
+        self.dirty = False
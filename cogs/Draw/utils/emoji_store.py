@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from io import BytesIO
+from typing import Iterable, List, Optional, Tuple, Union
+
+import discord
+from pilmoji.source import BaseSource, Twemoji
+
+from .constants import EMOJI_STORE_DIR, EMOJI_STORE_OFFLINE
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmojiStore(BaseSource):
+    """A Pilmoji source that serves emoji images from a local directory.
+
+    Images are stored under the codepoints of unicode emojis or the ID of custom emojis,
+    so each image is downloaded from the upstream source at most once. In offline mode
+    the upstream source is never used, and emojis that are not stored render as blank.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = EMOJI_STORE_DIR,
+        *,
+        upstream: Optional[BaseSource] = None,
+        offline: Optional[bool] = EMOJI_STORE_OFFLINE,
+    ):
+        self.directory: str = directory
+        self.upstream: BaseSource = upstream or Twemoji()
+        self.offline: bool = offline
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} directory={self.directory!r} offline={self.offline}>"
+
+    @staticmethod
+    def key(emoji: Union[str, int]) -> Union[str, int]:
+        """Returns the ID of a custom emoji string, or the emoji itself"""
+
+        if isinstance(emoji, int):
+            return emoji
+        partial_emoji = discord.PartialEmoji.from_str(emoji)
+        return partial_emoji.id if partial_emoji.is_custom_emoji() else emoji
+
+    def path(self, key: Union[str, int]) -> str:
+        if isinstance(key, int):
+            return os.path.join(self.directory, "discord", f"{key}.png")
+        codepoints = "-".join(f"{ord(char):x}" for char in key)
+        return os.path.join(self.directory, "unicode", f"{codepoints}.png")
+
+    def read(self, key: Union[str, int]) -> Optional[bytes]:
+        try:
+            with open(self.path(key), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, key: Union[str, int], data: bytes):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so that readers never see a partial image
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+
+    def fetch(self, key: Union[str, int]) -> Optional[bytes]:
+        if self.offline:
+            return None
+
+        try:
+            if isinstance(key, int):
+                stream = self.upstream.get_discord_emoji(key)
+            else:
+                stream = self.upstream.get_emoji(key)
+        except OSError as error:  # Both urllib's and requests' errors subclass OSError
+            logger.warning("Could not fetch emoji %s: %s", key, error)
+            return None
+        if stream is None:
+            return None
+
+        data = stream.getvalue()
+        try:
+            self.write(key, data)
+        except OSError as error:
+            logger.warning("Could not store emoji %s: %s", key, error)
+        return data
+
+    def get(self, key: Union[str, int]) -> Optional[BytesIO]:
+        data = self.read(key)
+        if data is None:
+            data = self.fetch(key)
+        return BytesIO(data) if data is not None else None
+
+    def get_emoji(self, emoji: str, /) -> Optional[BytesIO]:
+        return self.get(emoji)
+
+    def get_discord_emoji(self, id: int, /) -> Optional[BytesIO]:
+        return self.get(int(id))
+
+    def prefetch(
+        self, emojis: Iterable[Union[str, int]]
+    ) -> Tuple[List[Union[str, int]], List[Union[str, int]]]:
+        """Stores every emoji that is not stored yet.
+        Returns the lists of emojis that were fetched and that could not be found."""
+
+        fetched, missing = [], []
+        for emoji in emojis:
+            key = self.key(emoji)
+            if os.path.exists(self.path(key)):
+                continue
+            data = self.fetch(key)
+            (fetched if data is not None else missing).append(key)
+        return fetched, missing
+
+
+EMOJI_STORE = EmojiStore()
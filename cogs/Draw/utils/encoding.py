@@ -0,0 +1,210 @@
+"""Compact binary encoding of a board's state.
+
+Layout of version 1, everything after the version byte being zlib-compressed:
+    version: u8
+    height, width: u8, u8
+    palette size, background index: u16, u16
+    palette entries, each one being either
+        0: u8, length: u8, utf-8 unicode emoji
+        1 or 2 (animated): u8, ID: u64, length: u8, utf-8 custom emoji name
+    index grid: height * width palette indices, u8 if the palette fits, else u16
+All integers are big-endian. The result is base64 (urlsafe, unpadded) encoded.
+
+A board's history is encoded separately, as the indices of its palette, with the layout
+of version 1 being, everything after the version byte being zlib-compressed:
+    version: u8
+    height, width: u16, u16
+    step count, index of the current step: u32, u32
+    base: height * width palette indices, u16
+    steps, each one being
+        cell count: u32
+        flat indices of the cells changed: cell count * u32
+        palette indices of the cells after the step: cell count * u16
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import struct
+import zlib
+from typing import List, Tuple
+
+import discord
+import numpy as np
+
+from .errors import BoardEncodingError
+from .history import CELL_DTYPE, History
+from .palette import PIXEL_DTYPE
+
+
+VERSION = 1
+HISTORY_VERSION = 1
+
+UNICODE = 0
+CUSTOM = 1
+ANIMATED = 2
+
+
+def encode_emoji(emoji: str) -> bytes:
+    partial_emoji = discord.PartialEmoji.from_str(emoji)
+    if partial_emoji.is_custom_emoji():
+        name = partial_emoji.name.encode()
+        return struct.pack(
+            f">BQB{len(name)}s",
+            ANIMATED if partial_emoji.animated else CUSTOM,
+            partial_emoji.id,
+            len(name),
+            name,
+        )
+
+    data = emoji.encode()
+    return struct.pack(f">BB{len(data)}s", UNICODE, len(data), data)
+
+
+def decode_emoji(data: memoryview, offset: int) -> Tuple[str, int]:
+    """Returns the emoji at offset and the offset after it"""
+
+    (kind,) = struct.unpack_from(">B", data, offset)
+    offset += 1
+    if kind == UNICODE:
+        (length,) = struct.unpack_from(">B", data, offset)
+        offset += 1
+        return bytes(data[offset : offset + length]).decode(), offset + length
+
+    if kind in (CUSTOM, ANIMATED):
+        emoji_id, length = struct.unpack_from(">QB", data, offset)
+        offset += 9
+        name = bytes(data[offset : offset + length]).decode()
+        return (
+            f"<{'a' if kind == ANIMATED else ''}:{name}:{emoji_id}>",
+            offset + length,
+        )
+
+    raise BoardEncodingError(f"Unknown emoji kind {kind}")
+
+
+def encode_board(pixels: np.ndarray, emojis: List[str], background: int) -> str:
+    """Encodes a board from its palette-index array, palette emojis and background index.
+    Only the emojis used on the board, and the background, are kept."""
+
+    used, grid = np.unique(
+        np.append(pixels.ravel(), background), return_inverse=True
+    )
+    grid, background = grid[:-1], int(grid[-1])
+    height, width = pixels.shape
+
+    payload = bytearray(struct.pack(">BBHH", height, width, len(used), background))
+    for index in used.tolist():
+        payload += encode_emoji(emojis[index])
+    payload += grid.astype(">u1" if len(used) <= 0x100 else ">u2").tobytes()
+
+    data = bytes([VERSION]) + zlib.compress(bytes(payload), 9)
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def decode_board(string: str) -> Tuple[np.ndarray, List[str], int]:
+    """Decodes a board encoded by encode_board into its palette-index array,
+    palette emojis and background index"""
+
+    try:
+        data = base64.urlsafe_b64decode(string + "=" * (-len(string) % 4))
+        if len(data) == 0 or data[0] != VERSION:
+            raise BoardEncodingError(
+                f"Unsupported board encoding version {data[0] if data else None}"
+            )
+        payload = memoryview(zlib.decompress(data[1:]))
+
+        height, width, size, background = struct.unpack_from(">BBHH", payload)
+        offset = 6
+        emojis = []
+        for _ in range(size):
+            emoji, offset = decode_emoji(payload, offset)
+            emojis.append(emoji)
+
+        dtype = ">u1" if size <= 0x100 else ">u2"
+        pixels = np.frombuffer(
+            payload, dtype=dtype, count=height * width, offset=offset
+        ).astype(PIXEL_DTYPE)
+    except (binascii.Error, zlib.error, struct.error, ValueError) as error:
+        raise BoardEncodingError(f"Invalid board encoding: {error}") from error
+
+    if size == 0 or pixels.max(initial=0) >= size or background >= size:
+        raise BoardEncodingError("Invalid board encoding: index out of range")
+    return pixels.reshape(height, width), emojis, background
+
+
+def pack_history(history: History) -> bytes:
+    """The uncompressed payload of encode_history, which only copies the history,
+    so that it can be compressed with compress_history off the event loop"""
+
+    height, width = history.base.shape
+    payload = bytearray(
+        struct.pack(">HHII", height, width, len(history.steps), history.index)
+    )
+    payload += history.base.astype(">u2").tobytes()
+    for step in history.steps:
+        payload += struct.pack(">I", len(step.cells))
+        payload += step.cells.astype(">u4").tobytes()
+        payload += step.after.astype(">u2").tobytes()
+    return bytes(payload)
+
+
+def compress_history(payload: bytes) -> bytes:
+    return bytes([HISTORY_VERSION]) + zlib.compress(payload)
+
+
+def encode_history(history: History) -> bytes:
+    """Encodes the retained steps of a history, and the state they start from"""
+
+    return compress_history(pack_history(history))
+
+
+def decode_history(data: bytes, *, palette_size: int, **kwargs) -> History:
+    """Decodes a history encoded by encode_history, by replaying its steps,
+    checking that it only uses the first palette_size palette indices.
+    Other keyword arguments are passed to History."""
+
+    try:
+        if len(data) == 0 or data[0] != HISTORY_VERSION:
+            raise BoardEncodingError(
+                f"Unsupported history encoding version {data[0] if data else None}"
+            )
+        payload = memoryview(zlib.decompress(data[1:]))
+
+        height, width, step_count, index = struct.unpack_from(">HHII", payload)
+        offset = 12
+        base = np.frombuffer(
+            payload, dtype=">u2", count=height * width, offset=offset
+        ).astype(PIXEL_DTYPE)
+        offset += base.nbytes
+        if index > step_count or base.max(initial=0) >= palette_size:
+            raise BoardEncodingError("Invalid history encoding: index out of range")
+
+        history = History(base.reshape(height, width), **kwargs)
+        for _ in range(step_count):
+            (count,) = struct.unpack_from(">I", payload, offset)
+            offset += 4
+            cells = np.frombuffer(payload, dtype=">u4", count=count, offset=offset)
+            offset += count * 4
+            after = np.frombuffer(payload, dtype=">u2", count=count, offset=offset)
+            offset += count * 2
+
+            if (
+                count == 0
+                or cells.max() >= height * width
+                or after.max() >= palette_size
+            ):
+                raise BoardEncodingError("Invalid history encoding: index out of range")
+            history.push(
+                np.unravel_index(cells.astype(CELL_DTYPE), (height, width)),
+                after.astype(PIXEL_DTYPE),
+            )
+    except (zlib.error, struct.error, ValueError) as error:
+        raise BoardEncodingError(f"Invalid history encoding: {error}") from error
+
+    # Steps after the current one are redone, and any that were discarded
+    # from the front while replaying no longer count towards the index
+    while history.index > max(index - history.discarded, 0):
+        history.undo()
+    return history
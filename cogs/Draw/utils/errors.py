@@ -4,3 +4,23 @@ class DrawError(Exception):
 
 class InvalidDrawMessageError(DrawError):
     pass
+
+
+class EmojiPoolFullError(DrawError):
+    pass
+
+
+class BoardEncodingError(DrawError):
+    pass
+
+
+class TimelapseTooLargeError(DrawError):
+    pass
+
+
+class ImageTooLargeError(DrawError):
+    pass
+
+
+class RenderError(DrawError):
+    pass
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import List, Literal, Optional, Tuple
+
+import numpy as np
+
+
+def run_bounds(line: np.ndarray, col: int) -> Tuple[int, int]:
+    """Returns the (start, stop) bounds of the run of True values in line that contains col"""
+
+    before = np.flatnonzero(~line[:col])
+    after = np.flatnonzero(~line[col + 1 :])
+    start = before[-1] + 1 if before.size else 0
+    stop = col + 1 + after[0] if after.size else len(line)
+    return int(start), int(stop)
+
+
+def flood_fill(
+    pixels: np.ndarray,
+    start: Tuple[int, int],
+    *,
+    connectivity: Optional[Literal[4, 8]] = 4,
+    mask: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Scanline flood fill. Returns a boolean mask of the cells connected to start
+    that have the same value as it.
+
+    Connected cells are found a whole horizontal run at a time, and the runs in the rows above
+    and below each run are seeded with one vectorized comparison, so every cell is visited once.
+    If a mask is passed, cells outside of it are never filled.
+    """
+
+    if connectivity not in (4, 8):
+        raise ValueError("Connectivity must be either 4 or 8")
+
+    height, width = pixels.shape
+    fillable = pixels == pixels[start]
+    if mask is not None:
+        fillable &= mask
+    # The visited bitmap, cells are removed from fillable once they are filled
+    filled = np.zeros_like(fillable)
+    if not fillable[start]:
+        return filled
+
+    # Diagonal neighbours extend the range of cells to check in adjacent rows by one
+    reach = 1 if connectivity == 8 else 0
+
+    seeds: List[Tuple[int, int]] = [start]
+    while seeds:
+        row, col = seeds.pop()
+        if not fillable[row, col]:
+            continue
+
+        run_start, run_stop = run_bounds(fillable[row], col)
+        filled[row, run_start:run_stop] = True
+        fillable[row, run_start:run_stop] = False
+
+        check_start = max(run_start - reach, 0)
+        check_stop = min(run_stop + reach, width)
+        for adjacent in (row - 1, row + 1):
+            if not 0 <= adjacent < height:
+                continue
+            line = fillable[adjacent, check_start:check_stop]
+            # Seed the first cell of each run of fillable cells in the adjacent row
+            run_starts = np.flatnonzero(line & ~np.concatenate(([False], line[:-1])))
+            seeds.extend((adjacent, check_start + int(c)) for c in run_starts)
+
+    return filled
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import sys
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from .constants import HISTORY_KEYFRAME_INTERVAL, HISTORY_MAX_BYTES
+
+
+CELL_DTYPE = np.uint32  # Dtype of the flat cell indices stored in each step
+
+
+class Step:
+    """A single change to a board, stored as the flat indices of the cells that changed
+    along with their values before and after the change"""
+
+    __slots__ = ("cells", "before", "after", "keyframe")
+
+    def __init__(self, cells: np.ndarray, before: np.ndarray, after: np.ndarray):
+        self.cells: np.ndarray = cells
+        self.before: np.ndarray = before
+        self.after: np.ndarray = after
+        # A full copy of the board after this step, stored every few steps
+        # so that any state can be rebuilt without replaying the whole history
+        self.keyframe: Optional[np.ndarray] = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} cells={len(self.cells)} keyframe={self.keyframe is not None}>"
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            sys.getsizeof(array)
+            for array in (self.cells, self.before, self.after, self.keyframe)
+            if array is not None
+        )
+
+
+class History:
+    """Undo/redo history of a board that keeps only the cells changed by each step,
+    discarding the oldest steps once it grows past its memory budget"""
+
+    def __init__(
+        self,
+        initial: np.ndarray,
+        *,
+        max_bytes: int = HISTORY_MAX_BYTES,
+        keyframe_interval: int = HISTORY_KEYFRAME_INTERVAL,
+    ):
+        self.max_bytes: int = max_bytes
+        self.keyframe_interval: int = keyframe_interval
+
+        # The oldest state that can still be reached
+        self.base: np.ndarray = initial.copy()
+        # The state after the first `index` steps have been applied to base
+        self.current: np.ndarray = initial.copy()
+        self.steps: List[Step] = []
+        self.index: int = 0
+        # The number of steps that were discarded from the front to stay within budget
+        self.discarded: int = 0
+
+        self.nbytes: int = 0
+
+    def __len__(self) -> int:
+        """The number of states in the history, including the base state"""
+
+        return len(self.steps) + 1
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} index={self.index} steps={len(self.steps)} discarded={self.discarded} nbytes={self.nbytes}>"
+
+    @property
+    def undo_count(self) -> int:
+        return self.index
+
+    @property
+    def redo_count(self) -> int:
+        return len(self.steps) - self.index
+
+    def can_undo(self) -> bool:
+        return self.undo_count > 0
+
+    def can_redo(self) -> bool:
+        return self.redo_count > 0
+
+    def flatten(
+        self, cells: Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]
+    ) -> np.ndarray:
+        """Converts a boolean mask or a (rows, cols) index to flat cell indices"""
+
+        if isinstance(cells, np.ndarray) and cells.dtype == bool:
+            return np.flatnonzero(cells).astype(CELL_DTYPE)
+        return np.ravel_multi_index(cells, self.current.shape).astype(CELL_DTYPE)
+
+    def push(
+        self,
+        cells: Union[np.ndarray, Tuple[np.ndarray, np.ndarray]],
+        values: Union[int, np.ndarray],
+    ) -> Optional[np.ndarray]:
+        """Sets cells to values as a new step, discarding any steps that could be redone.
+        Returns the flat indices of the cells that changed, or None if nothing changed."""
+
+        flat = self.flatten(cells)
+        before = self.current.flat[flat]
+        after = np.broadcast_to(
+            np.asarray(values, dtype=self.current.dtype), flat.shape
+        )
+
+        changed = before != after
+        if not changed.any():
+            return None
+        flat, before, after = flat[changed], before[changed], after[changed]
+        # Cells may be repeated in the input, only keep their last value
+        flat, last = np.unique(flat[::-1], return_index=True)
+        before, after = before[::-1][last], after[::-1][last]
+
+        self.truncate()
+        self.current.flat[flat] = after
+
+        step = Step(flat, before, after)
+        if (self.discarded + self.index + 1) % self.keyframe_interval == 0:
+            step.keyframe = self.current.copy()
+        self.steps.append(step)
+        self.index += 1
+        self.nbytes += step.nbytes
+
+        self.compact()
+        return flat
+
+    def undo(self) -> Optional[np.ndarray]:
+        """Reverts the last applied step. Returns the flat indices of the cells that changed."""
+
+        if not self.can_undo():
+            return None
+        self.index -= 1
+        step = self.steps[self.index]
+        self.current.flat[step.cells] = step.before
+        return step.cells
+
+    def redo(self) -> Optional[np.ndarray]:
+        """Re-applies the next step. Returns the flat indices of the cells that changed."""
+
+        if not self.can_redo():
+            return None
+        step = self.steps[self.index]
+        self.current.flat[step.cells] = step.after
+        self.index += 1
+        return step.cells
+
+    def pop(self) -> Optional[np.ndarray]:
+        """Reverts the last applied step and forgets it, along with any steps after it"""
+
+        cells = self.undo()
+        if cells is not None:
+            self.truncate()
+        return cells
+
+    def truncate(self):
+        """Discards all steps that could be redone"""
+
+        for step in self.steps[self.index :]:
+            self.nbytes -= step.nbytes
+        del self.steps[self.index :]
+
+    def compact(self):
+        """Discards the oldest steps, or the furthest redo steps if there are
+        no steps to undo, until the history fits within its memory budget"""
+
+        while self.nbytes > self.max_bytes and len(self.steps) > 1:
+            if self.index > 0:
+                step = self.steps.pop(0)
+                if step.keyframe is not None:
+                    self.base = step.keyframe
+                else:
+                    self.base.flat[step.cells] = step.after
+                self.index -= 1
+                self.discarded += 1
+            else:
+                step = self.steps.pop()
+            self.nbytes -= step.nbytes
+
+    def state_at(self, index: int) -> np.ndarray:
+        """Returns a copy of the board after the first `index` retained steps,
+        starting from the closest keyframe before it"""
+
+        if not 0 <= index <= len(self.steps):
+            raise IndexError("History index out of range")
+
+        start, state = 0, self.base
+        for idx in range(index, 0, -1):
+            if (keyframe := self.steps[idx - 1].keyframe) is not None:
+                start, state = idx, keyframe
+                break
+
+        state = state.copy()
+        for step in self.steps[start:index]:
+            state.flat[step.cells] = step.after
+        return state
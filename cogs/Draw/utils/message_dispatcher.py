@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import discord
+
+
+Key = Tuple[int, int]
+
+
+class MessageDispatcher:
+    """Routes messages to the prompts waiting on them, by (channel ID, author ID).
+
+    Each channel and author can have one prompt waiting at a time, so different users,
+    or the same user in different channels, can be prompted at once. A single listener
+    looks up the waiting prompt of each message, instead of every prompt adding
+    its own global wait_for listener.
+    """
+
+    def __init__(self):
+        self.waiters: Dict[Key, Tuple[asyncio.Future, Optional[Callable]]] = {}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} waiting={len(self.waiters)}>"
+
+    def waiting(self, channel_id: int, author_id: int) -> bool:
+        return (channel_id, author_id) in self.waiters
+
+    @contextlib.contextmanager
+    def listen(
+        self,
+        channel_id: int,
+        author_id: int,
+        *,
+        check: Optional[Callable[[discord.Message], bool]] = None,
+    ) -> Iterator[asyncio.Future]:
+        """Claims a channel and author until exit. Yields a future that
+        is set to the first message from them that passes the check."""
+
+        key = (channel_id, author_id)
+        if key in self.waiters:
+            raise ValueError(f"A message is already being waited for from {key}")
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiters[key] = (future, check)
+        try:
+            yield future
+        finally:
+            del self.waiters[key]
+            future.cancel()
+
+    def dispatch(self, message: discord.Message):
+        waiter = self.waiters.get((message.channel.id, message.author.id))
+        if waiter is None:
+            return
+
+        future, check = waiter
+        if future.done():
+            return
+        try:
+            if check is not None and not check(message):
+                return
+        except Exception as error:
+            future.set_exception(error)
+        else:
+            future.set_result(message)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional
+
+import discord
+import numpy as np
+
+from .constants import CURSOR, inv_CURSOR
+
+
+PIXEL_DTYPE = np.uint16  # Dtype of a board's pixel array, which holds palette indices
+MAX_PALETTE_SIZE = np.iinfo(PIXEL_DTYPE).max + 1
+
+
+class Palette:
+    """Maps the emojis used on a board to the small integer indices stored in its pixel array.
+
+    Emojis are normalized once when they are first seen, so that different string forms of
+    the same emoji (e.g. a custom emoji under a different name, or its cursor version)
+    share a single index.
+    """
+
+    def __init__(self, emojis: Optional[Iterable[str]] = None):
+        self.emojis: List[str] = []
+        # The form each emoji was first added in, which keeps the names of custom emojis
+        self.originals: List[str] = []
+        # Maps both the raw strings passed in and their normalized forms to indices
+        self.indices: Dict[str, int] = {}
+        self._array: Optional[np.ndarray] = None
+        self._cursor_array: Optional[np.ndarray] = None
+
+        for emoji in emojis or ():
+            self.index(emoji)
+
+    def __len__(self) -> int:
+        return len(self.emojis)
+
+    def __getitem__(self, index: int) -> str:
+        return self.emojis[index]
+
+    def __contains__(self, emoji: str) -> bool:
+        return self.find(emoji) is not None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} emojis={self.emojis!r}>"
+
+    @staticmethod
+    def normalize(emoji: str) -> str:
+        """Returns the form of an emoji that is stored on the board"""
+
+        partial_emoji = discord.PartialEmoji.from_str(inv_CURSOR.get(emoji, emoji))
+        if partial_emoji.is_custom_emoji():
+            # Custom emojis are identified by their ID alone, so shorten the name
+            # to keep the board's text as short as possible
+            partial_emoji.name = "e"
+        return str(partial_emoji)
+
+    @property
+    def array(self) -> np.ndarray:
+        """The palette as an object array, to map a pixel array to emoji strings in one step"""
+
+        if self._array is None:
+            self._array = np.array(self.emojis, dtype="object")
+        return self._array
+
+    @property
+    def cursor_array(self) -> np.ndarray:
+        """Same as array, but with each emoji replaced by its cursor version"""
+
+        if self._cursor_array is None:
+            self._cursor_array = np.array(
+                [CURSOR.get(emoji, emoji) for emoji in self.emojis], dtype="object"
+            )
+        return self._cursor_array
+
+    def find(self, emoji: str) -> Optional[int]:
+        """Returns the index of an emoji if it is in the palette, without adding it"""
+
+        if (index := self.indices.get(emoji)) is not None:
+            return index
+        return self.indices.get(self.normalize(emoji))
+
+    def index(self, emoji: str) -> int:
+        """Returns the index of an emoji, adding it to the palette if it is not in it yet"""
+
+        if (index := self.indices.get(emoji)) is not None:
+            return index
+
+        normalized = self.normalize(emoji)
+        index = self.indices.get(normalized)
+        if index is None:
+            if len(self.emojis) >= MAX_PALETTE_SIZE:
+                raise ValueError("Palette is full")
+            index = len(self.emojis)
+            self.emojis.append(normalized)
+            self.originals.append(inv_CURSOR.get(emoji, emoji))
+            self.indices[normalized] = index
+            self._array = None
+            self._cursor_array = None
+
+        self.indices[emoji] = index
+        return index
+
+    def to_emojis(self, pixels: np.ndarray) -> np.ndarray:
+        """Maps an array of palette indices to an array of emoji strings"""
+
+        return self.array[pixels]
+
+    def to_cursor_emojis(self, pixels: np.ndarray) -> np.ndarray:
+        """Maps an array of palette indices to an array of their cursor emoji strings"""
+
+        return self.cursor_array[pixels]
+
+    def from_emojis(self, emojis: np.ndarray) -> np.ndarray:
+        """Maps an array of emoji strings to an array of palette indices"""
+
+        emojis = np.asarray(emojis, dtype="object")
+        unique, inverse = np.unique(emojis, return_inverse=True)
+        indices = np.array([self.index(emoji) for emoji in unique], dtype=PIXEL_DTYPE)
+        return indices[inverse].reshape(emojis.shape)
+
+    def copy(self) -> Palette:
+        palette = self.__class__()
+        palette.emojis = self.emojis.copy()
+        palette.originals = self.originals.copy()
+        palette.indices = self.indices.copy()
+        return palette
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import io
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from .atlas import TILE_ATLAS, fit_size
+from .constants import (
+    PREVIEW_CURSOR_COLOURS,
+    PREVIEW_MAX_SIZE,
+    PREVIEW_TILE_SIZE,
+)
+from .renderer import RENDERER
+
+
+# (row_start, row_stop, col_start, col_stop) of the selected cells, like Board.cursor_bounds
+Bounds = Tuple[int, int, int, int]
+
+
+def compose_preview(
+    pixels: np.ndarray, emojis: Sequence[str], size: int
+) -> Tuple[Tuple[int, int], bytes]:
+    """The size and raw RGBA data of the image of a board, without the cursors.
+    A render job, so it can run in a worker process."""
+
+    image = TILE_ATLAS.compose(pixels, emojis, size=size)
+    return image.size, image.tobytes()
+
+
+def draw_cursors(base: Image.Image, bounds: Optional[Bounds], *, size: int) -> bytes:
+    """The PNG of an image of a board with the outline of the cursors drawn on top"""
+
+    image = base.copy()
+    if bounds is not None:
+        x_step, y_step = TILE_ATLAS.steps(size)
+        row_start, row_stop, col_start, col_stop = bounds
+        box = [
+            col_start * x_step,
+            row_start * y_step,
+            (col_stop - 1) * x_step + size - 1,
+            (row_stop - 1) * y_step + size - 1,
+        ]
+        draw = ImageDraw.Draw(image)
+        width = max(size // 12, 1)
+        # Outlines of alternating colours, so that the cursors show up on any colour
+        for colour in PREVIEW_CURSOR_COLOURS:
+            draw.rectangle(box, outline=colour, width=width)
+            box = [box[0] + width, box[1] + width, box[2] - width, box[3] - width]
+            if box[0] > box[2] or box[1] > box[3]:
+                break
+
+    with io.BytesIO() as buffer:
+        # Previews are replaced on every edit, so favour speed over size
+        image.save(buffer, "PNG", compress_level=1)
+        return buffer.getvalue()
+
+
+class BoardPreview:
+    """The PNG preview of a board, for when it is sent as an image instead of emojis.
+
+    The tiles are composited in a render worker only when the pixels change,
+    and the cursors are drawn on top of that when they move.
+    """
+
+    def __init__(self):
+        self.base: Optional[Image.Image] = None
+        self.base_key: Optional[Tuple] = None
+        self.png: Optional[bytes] = None
+        self.png_key: Optional[Tuple] = None
+
+    async def render(
+        self,
+        pixels: np.ndarray,
+        emojis: Sequence[str],
+        bounds: Optional[Bounds],
+        *,
+        version: int,
+    ) -> bytes:
+        """Returns the PNG preview of a board, where version changes whenever its pixels do"""
+
+        size = fit_size(pixels.shape, max_size=PREVIEW_MAX_SIZE, size=PREVIEW_TILE_SIZE)
+        base_key = (version, pixels.shape)
+        png_key = (base_key, bounds)
+        if self.png is not None and self.png_key == png_key:
+            return self.png
+
+        if self.base is None or self.base_key != base_key:
+            image_size, data = await RENDERER.run(
+                compose_preview, pixels.copy(), list(emojis), size
+            )
+            self.base = Image.frombytes("RGBA", image_size, data)
+            self.base_key = base_key
+
+        base = self.base
+        loop = asyncio.get_running_loop()
+        self.png = await loop.run_in_executor(
+            None, lambda: draw_cursors(base, bounds, size=size)
+        )
+        self.png_key = png_key
+        return self.png
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import io
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .colour_space import lab_to_rgb, rgb_to_lab
+from .constants import (
+    IMPORT_ALPHA_THRESHOLD,
+    IMPORT_MAX_PIXELS,
+    KMEANS_ITERATIONS,
+    PALETTE_MIN_DELTA_E,
+    PALETTE_SAMPLE_SIZE,
+)
+from .errors import ImageTooLargeError
+
+
+RGBA = Tuple[int, int, int, int]
+
+
+def open_image(
+    data: bytes,
+    *,
+    draft: Optional[Tuple[int, int]] = None,
+    max_pixels: Optional[int] = IMPORT_MAX_PIXELS,
+) -> Image.Image:
+    """Opens and decodes an image, refusing ones with more than max_pixels pixels before
+    they are decoded. JPEGs are decoded at a fraction of their size if draft is passed,
+    as long as they stay at least that large.
+
+    Raises ImageTooLargeError for images that are too large or can't be read."""
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        if image.width * image.height > max_pixels:
+            raise ImageTooLargeError(
+                f"Image is {image.width}x{image.height}, which is more than {max_pixels} pixels"
+            )
+        if draft is not None:
+            image.draft("RGB", draft)
+        image.load()
+    except Image.DecompressionBombError as error:
+        raise ImageTooLargeError("Image is too large to be decoded") from error
+    except OSError as error:
+        # Includes files that aren't images at all, and truncated or corrupt ones
+        raise ImageTooLargeError("Image could not be read") from error
+    return image
+
+
+def downsample(image: Image.Image, size: Tuple[int, int]) -> np.ndarray:
+    """Resizes an image to size (width, height), averaging the pixels that
+    make up each new pixel, and returns it as an RGBA array"""
+
+    # Premultiply the alpha, so that transparent pixels don't bleed their colour
+    image = image.convert("RGBA").convert("RGBa")
+    image = image.resize(size, Image.Resampling.BOX, reducing_gap=2.0)
+    return np.asarray(image.convert("RGBA"))
+
+
+def nearest(points: np.ndarray, centres: np.ndarray) -> np.ndarray:
+    """Returns the index of the nearest centre to each point"""
+
+    distances = ((points[:, None, :] - centres[None, :, :]) ** 2).sum(axis=-1)
+    return distances.argmin(axis=1)
+
+
+def kmeans(
+    points: np.ndarray,
+    k: int,
+    *,
+    weights: Optional[np.ndarray] = None,
+    iterations: Optional[int] = KMEANS_ITERATIONS,
+    seed: Optional[int] = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Clusters weighted points into at most k clusters, returning the centres
+    and the cluster of each point. Deterministic for the same input."""
+
+    weights = np.ones(len(points)) if weights is None else weights.astype(np.float64)
+    if len(points) <= k:
+        return points.astype(np.float64), np.arange(len(points))
+
+    # k-means++ seeding, weighted by how many pixels each point stands for
+    rng = np.random.default_rng(seed)
+    centres = [points[rng.choice(len(points), p=weights / weights.sum())]]
+    distances = ((points - centres[0]) ** 2).sum(axis=1)
+    for _ in range(k - 1):
+        probabilities = distances * weights
+        if probabilities.sum() == 0:
+            break
+        centre = points[rng.choice(len(points), p=probabilities / probabilities.sum())]
+        centres.append(centre)
+        distances = np.minimum(distances, ((points - centre) ** 2).sum(axis=1))
+    centres = np.array(centres, dtype=np.float64)
+
+    labels = nearest(points, centres)
+    for _ in range(iterations):
+        totals = np.zeros_like(centres)
+        np.add.at(totals, labels, points * weights[:, None])
+        counts = np.bincount(labels, weights=weights, minlength=len(centres))
+        # Clusters that lost all their points keep their centre
+        filled = counts > 0
+        centres[filled] = totals[filled] / counts[filled, None]
+
+        new_labels = nearest(points, centres)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+    return centres, labels
+
+
+def quantize(rgba: np.ndarray, n_colours: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduces an (..., 4) RGBA array to at most n_colours opaque colours, clustered in CIELAB.
+
+    Returns an array of the index of each pixel's colour, which is len(colours)
+    for transparent pixels, and the RGBA colours sorted by how many pixels use them.
+    """
+
+    shape = rgba.shape[:-1]
+    rgba = rgba.reshape(-1, 4)
+    opaque = rgba[:, 3] >= IMPORT_ALPHA_THRESHOLD
+
+    # Cluster the distinct colours weighted by their count, rather than every pixel
+    unique, inverse, counts = np.unique(
+        rgba[opaque, :3], axis=0, return_inverse=True, return_counts=True
+    )
+    if len(unique) == 0:
+        return np.zeros(shape, dtype=np.intp), np.empty((0, 4), dtype=np.uint8)
+
+    centres, labels = kmeans(rgb_to_lab(unique), n_colours, weights=counts)
+    # Drop empty clusters and sort the rest by usage, most used first
+    usage = np.bincount(labels, weights=counts, minlength=len(centres))
+    order = np.argsort(-usage, kind="stable")[: np.count_nonzero(usage)]
+    rank = np.empty(len(centres), dtype=np.intp)
+    rank[order] = np.arange(len(order))
+
+    colours = np.empty((len(order), 4), dtype=np.uint8)
+    colours[:, :3] = lab_to_rgb(centres[order])
+    colours[:, 3] = 255
+
+    indices = np.full(len(rgba), len(colours), dtype=np.intp)
+    indices[opaque] = rank[labels[inverse.ravel()]]
+    return indices.reshape(shape), colours
+
+
+def quantize_image(
+    data: bytes, size: Tuple[int, int], n_colours: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Downsamples an image to size (width, height) and quantizes it, see quantize.
+    A render job, so it can run in a worker process."""
+
+    # JPEGs can be decoded at a fraction of their size to begin with
+    return quantize(downsample(open_image(data, draft=size), size), n_colours)
+
+
+def extract_palette(
+    data: bytes,
+    n_colours: int,
+    *,
+    sample_size: Optional[int] = PALETTE_SAMPLE_SIZE,
+    min_distance: Optional[float] = PALETTE_MIN_DELTA_E,
+) -> List[Tuple[RGBA, float]]:
+    """Returns the n_colours most used colours of an image that are at least min_distance
+    (ΔE 1976) apart, with the share of the visible pixels of the image each one covers.
+    A render job, so it can run in a worker process."""
+
+    image = open_image(data, draft=(sample_size, sample_size)).convert("RGBA")
+    # Sample the pixels rather than averaging them, so that only colours of the image are found
+    image.thumbnail((sample_size, sample_size), Image.Resampling.NEAREST)
+
+    rgba = np.asarray(image).reshape(-1, 4)
+    rgba = rgba[rgba[:, 3] >= IMPORT_ALPHA_THRESHOLD]
+    if len(rgba) == 0:
+        return []
+
+    unique, counts = np.unique(rgba, axis=0, return_counts=True)
+    lab = rgb_to_lab(unique[:, :3])
+    # Cluster into more colours than needed, as clusters too close together are merged next
+    centres, labels = kmeans(lab, n_colours * 2, weights=counts)
+    usage = np.bincount(labels, weights=counts, minlength=len(centres))
+
+    # Each cluster is represented by its most common colour, and merged into
+    # a more used one if their representatives are too close
+    kept: List[int] = []
+    shares: List[float] = []
+    for cluster in np.argsort(-usage, kind="stable")[: np.count_nonzero(usage)]:
+        members = np.flatnonzero(labels == cluster)
+        representative = members[counts[members].argmax()]
+        if kept:
+            distances = np.linalg.norm(lab[kept] - lab[representative], axis=1)
+            if distances.min() < min_distance:
+                shares[distances.argmin()] += usage[cluster]
+                continue
+        kept.append(representative)
+        shares.append(usage[cluster])
+
+    total = counts.sum()
+    palette = [
+        (tuple(unique[index].tolist()), float(share / total))
+        for index, share in zip(kept, shares)
+    ]
+    # Merging may have changed the order
+    palette.sort(key=lambda colour: colour[1], reverse=True)
+    return palette[:n_colours]
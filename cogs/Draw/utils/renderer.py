@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import sys
+import time
+import typing
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+
+from .atlas import TILE_ATLAS
+from .constants import (
+    EMOJI_SIZE,
+    RENDER_PROCESSES,
+    RENDER_TIMEOUT,
+    base_colour_options,
+)
+from .errors import RenderError
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def warm_worker():
+    """Rasterizes the tiles of the base colours once in each worker process"""
+
+    for option in base_colour_options():
+        TILE_ATLAS.tile(option.value, size=EMOJI_SIZE)
+
+
+@contextlib.contextmanager
+def worker_main():
+    """Makes worker processes spawned meanwhile start from this module, instead of
+    re-importing the bot's __main__ (main.py) and with it the whole bot in each worker"""
+
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = sys.modules[__name__]
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+class Renderer:
+    """Runs CPU-heavy Draw rendering jobs off the event loop's process.
+
+    Jobs are module-level functions with picklable arguments (index grids, palettes, RGBA
+    tuples), and return picklable results (PNG bytes), so that they can run in a pool of
+    worker processes instead of contending for the GIL with the event loop. With 0
+    processes, jobs run on a thread pool instead.
+    """
+
+    def __init__(
+        self,
+        *,
+        processes: Optional[int] = RENDER_PROCESSES,
+        timeout: Optional[float] = RENDER_TIMEOUT,
+    ):
+        self.processes: int = processes
+        self.timeout: float = timeout
+        self._executor: Optional[Executor] = None
+
+        # Number of jobs submitted and not finished yet
+        self.depth: int = 0
+        self.max_depth: int = 0
+        # Number of jobs by outcome
+        self.stats: typing.Counter[str] = Counter()
+        self.total_time: float = 0.0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} processes={self.processes} depth={self.depth} stats={dict(self.stats)}>"
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.processes > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    # Forking would copy the bot's event loop and threads into the workers
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=warm_worker,
+                )
+            else:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="draw-render")
+        return self._executor
+
+    @property
+    def average_time(self) -> float:
+        finished = self.stats["completed"]
+        return self.total_time / finished if finished else 0.0
+
+    async def run(self, job: Callable[..., T], *args: Any) -> T:
+        """Runs a job in the pool, raising asyncio.TimeoutError if it takes longer than the timeout.
+
+        If a worker dies, the pool is restarted and the job is tried once more on the new pool,
+        raising RenderError if that breaks too."""
+
+        loop = asyncio.get_running_loop()
+        self.depth += 1
+        self.max_depth = max(self.max_depth, self.depth)
+        self.stats["submitted"] += 1
+        start = time.perf_counter()
+        try:
+            for attempt in range(2):
+                try:
+                    # Workers are spawned on the first submit to a pool
+                    with worker_main():
+                        future = loop.run_in_executor(self.executor, job, *args)
+                    result = await asyncio.wait_for(future, self.timeout)
+                except BrokenProcessPool as error:
+                    # A worker died, so start a new pool for this and the next jobs
+                    logger.warning("Draw render pool broke, restarting it")
+                    self.stats["restarts"] += 1
+                    self.shutdown()
+                    if attempt == 1:
+                        raise RenderError("Draw render pool broke twice") from error
+                else:
+                    break
+        except asyncio.TimeoutError:
+            # A job that already started can't be stopped, its result is just dropped
+            self.stats["timed_out"] += 1
+            raise
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        else:
+            self.stats["completed"] += 1
+            self.total_time += time.perf_counter() - start
+            return result
+        finally:
+            self.depth -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+RENDERER = Renderer()
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import time
+import typing
+from collections import Counter
+from dataclasses import astuple, dataclass, fields, replace
+from typing import Callable, Dict, List, Optional
+
+import asyncpg
+
+from .constants import (
+    DATABASE_URL,
+    SESSION_FLUSH_INTERVAL,
+    SESSION_MAX_AGE,
+    SESSION_PRUNE_INTERVAL,
+    SESSION_SCHEMA_FILE,
+)
+from .encoding import compress_history
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Session:
+    """A snapshot of a draw view, see schema.sql"""
+
+    message_id: int
+    channel_id: int
+    author_id: int
+    background: str
+    palette: List[str]  # The emojis of the board's palette indices
+    # Packed by pack_history in snapshots, and compressed into the encode_history format when written
+    history: bytes
+    cursor: str
+    cursor_row: int
+    cursor_col: int
+    tool: str
+    snapping: str
+    image_mode: bool
+    colour_options: List[str]  # The emojis of the options added to the colour menu
+
+
+COLUMNS = [field.name for field in fields(Session)]
+UPSERT = (
+    f"INSERT INTO draw_sessions ({', '.join(COLUMNS)}) "
+    f"VALUES ({', '.join(f'${idx}' for idx in range(1, len(COLUMNS) + 1))}) "
+    f"ON CONFLICT (message_id) DO UPDATE SET "
+    + ", ".join(f"{column} = EXCLUDED.{column}" for column in COLUMNS[1:])
+    + ", updated_at = now()"
+)
+
+
+class SessionStore:
+    """Persists draw sessions to Postgres, so that they can be resumed after
+    a restart or after their view times out.
+
+    Writes are behind and coalesced: saving a session only marks it as changed, and a
+    background task snapshots and writes every changed session once per flush interval.
+    Nothing on the interaction path waits on the database. Without a database URL, or if
+    the database can't be reached at startup, sessions are not persisted.
+    """
+
+    def __init__(
+        self,
+        *,
+        dsn: Optional[str] = DATABASE_URL,
+        interval: Optional[float] = SESSION_FLUSH_INTERVAL,
+    ):
+        self.dsn: Optional[str] = dsn
+        self.interval: float = interval
+        self.pool: Optional[asyncpg.Pool] = None
+
+        # Functions that snapshot the sessions changed since the last flush, by message ID
+        self.dirty: Dict[int, Callable[[], Session]] = {}
+        self.lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_prune: float = 0.0
+
+        # Number of saves, saves coalesced into a pending one, sessions written and failed flushes
+        self.stats: typing.Counter[str] = Counter()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} connected={self.pool is not None} dirty={len(self.dirty)} stats={dict(self.stats)}>"
+
+    @property
+    def enabled(self) -> bool:
+        return self.pool is not None
+
+    async def connect(self):
+        if self.dsn is None:
+            logger.info("DATABASE_URL is not set, draw sessions will not be persisted")
+            return
+
+        try:
+            with open(SESSION_SCHEMA_FILE) as file:
+                schema = file.read()
+            pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=4)
+        except Exception:
+            # The bot works without sessions, so a database that's down must not stop it
+            logger.exception(
+                "Could not connect to the database, draw sessions will not be persisted"
+            )
+            return
+
+        try:
+            # The schema is only run by Postgres on a new volume, so create the table on existing ones
+            await pool.execute(schema)
+        except Exception:
+            logger.exception(
+                "Could not create the draw sessions table, draw sessions will not be persisted"
+            )
+            await pool.close()
+            return
+
+        self.pool = pool
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self.pool is not None:
+            await self.flush()
+            await self.pool.close()
+            self.pool = None
+
+    def save(self, message_id: int, snapshot: Callable[[], Session]):
+        """Marks a session as changed, to be snapshotted with snapshot on the next flush"""
+
+        if self.pool is None:
+            return
+        self.stats["saves"] += 1
+        if message_id in self.dirty:
+            self.stats["coalesced"] += 1
+        self.dirty[message_id] = snapshot
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+                if time.monotonic() - self._last_prune > SESSION_PRUNE_INTERVAL:
+                    await self.prune()
+            except Exception:
+                logger.exception("Failed to flush draw sessions")
+
+    async def flush(self):
+        """Writes the latest snapshot of every changed session"""
+
+        async with self.lock:
+            if self.pool is None or not self.dirty:
+                return
+            dirty, self.dirty = self.dirty, {}
+
+            # Snapshots are taken on the event loop, so that they are consistent,
+            # but only copy the state, and compressing it is left to a thread
+            sessions = []
+            for message_id, snapshot in dirty.items():
+                try:
+                    sessions.append(snapshot())
+                except Exception:
+                    logger.exception(f"Failed to snapshot draw session {message_id}")
+
+            loop = asyncio.get_running_loop()
+            rows = await loop.run_in_executor(None, self.rows, sessions)
+            try:
+                async with self.pool.acquire() as connection:
+                    await connection.executemany(UPSERT, rows)
+            except (asyncpg.PostgresError, OSError) as error:
+                # Try again on the next flush, unless they were saved again since
+                logger.warning(f"Failed to write draw sessions: {error}")
+                self.stats["failed"] += 1
+                for message_id, snapshot in dirty.items():
+                    self.dirty.setdefault(message_id, snapshot)
+            else:
+                self.stats["written"] += len(sessions)
+
+    @staticmethod
+    def rows(sessions: List[Session]) -> List[tuple]:
+        return [
+            astuple(replace(session, history=compress_history(session.history)))
+            for session in sessions
+        ]
+
+    async def prune(self):
+        """Deletes the sessions that weren't updated for longer than SESSION_MAX_AGE"""
+
+        self._last_prune = time.monotonic()
+        await self.pool.execute(
+            "DELETE FROM draw_sessions WHERE updated_at < now() - $1::interval",
+            datetime.timedelta(seconds=SESSION_MAX_AGE),
+        )
+
+    async def fetch(
+        self, *, author_id: int, message_id: Optional[int] = None
+    ) -> Optional[Session]:
+        """Returns the session of a message if an ID is passed,
+        else the latest session of an author"""
+
+        if self.pool is None:
+            return None
+        # The session may have unwritten changes
+        await self.flush()
+        row = await self.pool.fetchrow(
+            f"SELECT {', '.join(COLUMNS)} FROM draw_sessions "
+            "WHERE author_id = $1 AND ($2::BIGINT IS NULL OR message_id = $2) "
+            "ORDER BY updated_at DESC LIMIT 1",
+            author_id,
+            message_id,
+        )
+        return Session(**row) if row is not None else None
+
+    async def delete(self, message_id: int):
+        self.dirty.pop(message_id, None)
+        if self.pool is None:
+            return
+        try:
+            async with self.lock:
+                await self.pool.execute(
+                    "DELETE FROM draw_sessions WHERE message_id = $1", message_id
+                )
+        except (asyncpg.PostgresError, OSError) as error:
+            # It is pruned once it's old enough anyway
+            logger.warning(f"Failed to delete draw session {message_id}: {error}")
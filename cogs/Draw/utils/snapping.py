@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import itertools
+import typing
+from typing import Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+
+from .colour import Colour
+from .colour_space import lab_to_rgb, rgb_to_lab
+from .constants import SNAP_GRID_STEP, SNAP_MAX_DELTA_E
+from .regexes import HEX_REGEX
+
+if typing.TYPE_CHECKING:
+    from main import Bot
+
+
+SnapMode = Literal["off", "grid", "emoji"]
+SNAP_MODES: Dict[SnapMode, str] = {
+    "off": "Use colours as they are",
+    "grid": "Round colours to a perceptual grid",
+    "emoji": "Reuse a similar existing colour emoji",
+}
+
+
+def snap_to_grid(rgb: np.ndarray, *, step: Optional[float] = SNAP_GRID_STEP) -> np.ndarray:
+    """Rounds 0-255 sRGB values to the nearest point of a CIELAB grid"""
+
+    return lab_to_rgb(np.round(rgb_to_lab(rgb) / step) * step)
+
+
+class ColourIndex:
+    """A grid index of colours in CIELAB, for finding the nearest colour within a distance.
+
+    Colours are bucketed into cubes as wide as the maximum distance, so every colour
+    within it of a query is in the query's cube or one of its 26 neighbours.
+    """
+
+    def __init__(self, rgba: np.ndarray, *, max_distance: Optional[float] = SNAP_MAX_DELTA_E):
+        self.rgba: np.ndarray = np.asarray(rgba, dtype=np.uint8).reshape(-1, 4)
+        self.lab: np.ndarray = rgb_to_lab(self.rgba[:, :3])
+        self.max_distance: float = max_distance
+
+        cells = np.floor(self.lab / max_distance).astype(int)
+        buckets: Dict[Tuple[int, int, int], List[int]] = {}
+        for i, cell in enumerate(map(tuple, cells.tolist())):
+            buckets.setdefault(cell, []).append(i)
+        self.cells: Dict[Tuple[int, int, int], np.ndarray] = {
+            cell: np.array(indices) for cell, indices in buckets.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.rgba)
+
+    def candidates(self, cell: Tuple[int, int, int]) -> np.ndarray:
+        neighbours = [
+            indices
+            for offset in itertools.product((-1, 0, 1), repeat=3)
+            if (indices := self.cells.get(tuple(np.add(cell, offset)))) is not None
+        ]
+        return np.concatenate(neighbours) if neighbours else np.empty(0, dtype=int)
+
+    def nearest(self, rgba: np.ndarray) -> np.ndarray:
+        """Returns the index of the nearest colour with the same alpha
+        within the maximum distance (ΔE 1976) of each colour, or -1 if there is none"""
+
+        rgba = np.asarray(rgba, dtype=np.uint8).reshape(-1, 4)
+        lab = rgb_to_lab(rgba[:, :3])
+        cells = np.floor(lab / self.max_distance).astype(int)
+
+        result = np.full(len(rgba), -1)
+        for i, cell in enumerate(map(tuple, cells.tolist())):
+            candidates = self.candidates(cell)
+            candidates = candidates[self.rgba[candidates, 3] == rgba[i, 3]]
+            if candidates.size == 0:
+                continue
+            distances = np.linalg.norm(self.lab[candidates] - lab[i], axis=1)
+            if distances.min() <= self.max_distance:
+                result[i] = candidates[distances.argmin()]
+        return result
+
+
+class ColourSnapper:
+    """Snaps colours before their emojis are created, so that near-duplicate colours
+    share an emoji instead of each taking up an upload and an emoji slot"""
+
+    def __init__(self, *, bot: Bot):
+        self.bot = bot
+        self._index: Optional[ColourIndex] = None
+        self._index_version: Optional[int] = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} indexed={len(self._index) if self._index else 0}>"
+
+    @property
+    def index(self) -> ColourIndex:
+        """Index of the registered colour emojis, rebuilt when they change"""
+
+        cache = self.bot.emoji_cache
+        if self._index is None or self._index_version != cache.version:
+            hexes = [name for name in cache.cache if HEX_REGEX.fullmatch(name)]
+            rgba = np.array(
+                [Colour.from_hex(hex).RGBA for hex in hexes], dtype=np.uint8
+            ).reshape(-1, 4)
+            self._index = ColourIndex(rgba)
+            self._index_version = cache.version
+        return self._index
+
+    def snap(self, colours: List[Colour], *, mode: SnapMode) -> List[Colour]:
+        """Returns the colours snapped according to the mode"""
+
+        if mode == "off" or len(colours) == 0:
+            return colours
+
+        rgba = np.array([colour.RGBA for colour in colours], dtype=np.uint8)
+        if mode == "grid":
+            rgba[:, :3] = snap_to_grid(rgba[:, :3])
+        elif mode == "emoji":
+            index = self.index
+            nearest = index.nearest(rgba)
+            found = nearest != -1
+            rgba[found] = index.rgba[nearest[found]]
+        else:
+            raise ValueError(f"Unknown snapping mode {mode!r}")
+
+        return [Colour(tuple(values)) for values in rgba.tolist()]
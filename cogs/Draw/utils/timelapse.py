@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import io
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .atlas import TILE_ATLAS
+from .constants import (
+    TIMELAPSE_BACKGROUND,
+    TIMELAPSE_DURATION,
+    TIMELAPSE_MAX_FRAMES,
+    TIMELAPSE_MIN_TILE_SIZE,
+    TIMELAPSE_TILE_SIZE,
+)
+from .errors import TimelapseTooLargeError
+
+
+# The cells changed by each step, and their values after it
+Changes = List[Tuple[np.ndarray, np.ndarray]]
+
+
+class BoundedBuffer(io.BytesIO):
+    """A bytes buffer that refuses to grow past a limit, so that
+    an encoding that won't fit is abandoned as soon as it doesn't"""
+
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit: int = limit
+
+    def write(self, data: bytes) -> int:
+        if self.tell() + len(data) > self.limit:
+            raise TimelapseTooLargeError(f"Timelapse exceeds {self.limit} bytes")
+        return super().write(data)
+
+
+def frame_steps(step_count: int, max_frames: int) -> List[int]:
+    """Returns the number of steps applied in each frame after the first,
+    spread evenly so that at most max_frames frames are made. The last step always has a frame."""
+
+    if step_count <= max_frames - 1:
+        return list(range(1, step_count + 1))
+    return np.unique(
+        np.linspace(0, step_count, max_frames, dtype=int)[1:]
+    ).tolist()
+
+
+class FramePainter:
+    """Keeps the image of a board up to date by repainting only the tiles around changed cells"""
+
+    def __init__(self, pixels: np.ndarray, emojis: Sequence[str], *, size: int):
+        self.pixels: np.ndarray = pixels.copy()
+        self.emojis: Sequence[str] = emojis
+        self.size: int = size
+        self.x_step, self.y_step = TILE_ATLAS.steps(size)
+        self.tiles = {}
+        self.image: Image.Image = TILE_ATLAS.compose(self.pixels, emojis, size=size)
+
+    def tile(self, index: int) -> Image.Image:
+        if (tile := self.tiles.get(index)) is None:
+            tile = self.tiles[index] = TILE_ATLAS.tile(self.emojis[index], size=self.size)
+        return tile
+
+    def repaint(self, row: int, col: int):
+        """Repaints the area of a cell's tile, including the parts of neighbouring tiles that overlap it"""
+
+        height, width = self.pixels.shape
+        x0, y0 = col * self.x_step, row * self.y_step
+        x1, y1 = x0 + self.size, y0 + self.size
+        self.image.paste((0, 0, 0, 0), (x0, y0, x1, y1))
+
+        # Tiles are pasted in the same order as compose, so overlaps blend the same way
+        for r in range(max(row - 1, 0), min(row + 2, height)):
+            for c in range(max(col - 1, 0), min(col + 2, width)):
+                tx, ty = c * self.x_step, r * self.y_step
+                box = (max(x0, tx), max(y0, ty), min(x1, tx + self.size), min(y1, ty + self.size))
+                if box[0] >= box[2] or box[1] >= box[3]:
+                    continue
+                part = self.tile(int(self.pixels[r, c])).crop(
+                    (box[0] - tx, box[1] - ty, box[2] - tx, box[3] - ty)
+                )
+                self.image.paste(part, box[:2], part)
+
+    def apply(self, cells: np.ndarray, values: np.ndarray):
+        self.pixels.flat[cells] = values
+
+    def update(self, cells: np.ndarray):
+        if len(cells) > self.pixels.size // 2:
+            # Cheaper to compose it all again
+            self.image = TILE_ATLAS.compose(self.pixels, self.emojis, size=self.size)
+            return
+        for row, col in zip(*np.unravel_index(cells, self.pixels.shape)):
+            self.repaint(int(row), int(col))
+
+
+def frames(
+    base: np.ndarray,
+    changes: Changes,
+    emojis: Sequence[str],
+    *,
+    size: int,
+    max_frames: int,
+) -> Iterator[Image.Image]:
+    painter = FramePainter(base, emojis, size=size)
+
+    def flatten() -> Image.Image:
+        frame = Image.new("RGBA", painter.image.size, TIMELAPSE_BACKGROUND)
+        frame.alpha_composite(painter.image)
+        # Frames are kept until the GIF is written, so keep them at one byte per pixel
+        return frame.convert("RGB").convert("P", palette=Image.Palette.ADAPTIVE)
+
+    yield flatten()
+    applied = 0
+    for stop in frame_steps(len(changes), max_frames):
+        changed = [cells for cells, _ in changes[applied:stop]]
+        for cells, values in changes[applied:stop]:
+            painter.apply(cells, values)
+        applied = stop
+        painter.update(np.unique(np.concatenate(changed)))
+        yield flatten()
+
+
+def render_timelapse(
+    base: np.ndarray,
+    changes: Changes,
+    emojis: Sequence[str],
+    *,
+    limit: int,
+    size: Optional[int] = TIMELAPSE_TILE_SIZE,
+    max_frames: Optional[int] = TIMELAPSE_MAX_FRAMES,
+) -> bytes:
+    """The animated GIF of a board's history, from its first state and the changes of each step.
+    A render job, so it can run in a worker process.
+
+    If the GIF would be larger than limit bytes, it is made again with half as many frames,
+    and then with smaller tiles, until it fits.
+    """
+
+    while True:
+        frame_count = min(len(changes), max_frames - 1) + 1
+        buffer = BoundedBuffer(limit)
+        try:
+            images = frames(base, changes, emojis, size=size, max_frames=frame_count)
+            frame_duration = max(TIMELAPSE_DURATION // frame_count, 20)
+            next(images).save(
+                buffer,
+                "GIF",
+                save_all=True,
+                append_images=images,
+                # The last frame is held for as long as the whole timelapse
+                duration=[frame_duration] * (frame_count - 1) + [TIMELAPSE_DURATION],
+                loop=0,
+                optimize=False,
+            )
+            return buffer.getvalue()
+        except TimelapseTooLargeError:
+            if frame_count > 2:
+                max_frames = frame_count // 2
+            elif size > TIMELAPSE_MIN_TILE_SIZE:
+                size //= 2
+                max_frames = TIMELAPSE_MAX_FRAMES
+            else:
+                raise
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import typing
-from typing import Optional, Tuple
+from typing import Literal, Optional, Tuple
 
 import discord
 import numpy as np
 
-from .constants import CURSOR
 from .colour import Colour
+from .fill import flood_fill
 
 if typing.TYPE_CHECKING:
     from main import Bot
@@ -113,7 +114,7 @@ class EyedropperTool(Tool):
     async def use(self, *, interaction: discord.Interaction) -> bool:
         """The method that is called when the tool is used"""
         cursor_pixel = self.board.cursor_pixel
-        emoji = discord.PartialEmoji.from_str(self.board.un_cursor(cursor_pixel))
+        emoji = discord.PartialEmoji.from_str(cursor_pixel)
 
         # Check if the option already exists
         option = self.view.colour_menu.emoji_to_option(emoji)
@@ -164,6 +165,11 @@ class FillTool(Tool):
     def autouse(self) -> bool:
         return True
 
+    @property
+    def connectivity(self) -> Literal[4, 8]:
+        """4 to fill across edges only, 8 to also fill across corners"""
+        return 4
+
     async def use(
         self,
         *,
@@ -171,54 +177,33 @@ class FillTool(Tool):
         initial_coords: Optional[Tuple[int, int]] = None,
     ) -> bool:
         """The method that is called when the tool is used"""
-        colour = self.board.cursor
-        if self.board.cursor_pixel == colour:
+        colour = self.board.palette.index(self.board.cursor)
+        if self.board.get_pixel_index() == colour:
             return
 
-        # Use Breadth-First Search algorithm to fill an area
         initial_coords = initial_coords or (
             self.board.cursor_row,
             self.board.cursor_col,
         )
-        initial_pixel = self.board.get_pixel(*initial_coords)
-
-        coords = []
-        queue = [initial_coords]
-        i = 0
-
-        while i < len(queue):
-            row, col = queue[i]
-            i += 1
-            # Skip to next cell in the queue if
-            # the row is less than 0 or greater than the max row possible,
-            # the col is less than 0 or greater than the max col possible or
-            # the current pixel (or its cursor version) is not the same as the pixel to replace (or its cursor version)
-            if (
-                any((row < 0, row > self.board.cursor_row_max))
-                or any((col < 0, col > self.board.cursor_col_max))
-                or any(
-                    (
-                        self.board.get_pixel(row, col) != initial_pixel,
-                        CURSOR.get(
-                            self.board.get_pixel(row, col),
-                            self.board.get_pixel(row, col),
-                        )
-                        != CURSOR.get(initial_pixel, initial_pixel),
-                    )
-                )
-                or (row, col) in coords
-            ):
-                continue
+        mask = flood_fill(
+            self.board.board, initial_coords, connectivity=self.connectivity
+        )
+
+        return self.board.draw(coords=mask)  # Draw all the cells
 
-            coords.append((row, col))
 
-            # Enqueue the four surrounding cells of the current cell
-            queue.append((row + 1, col))
-            queue.append((row - 1, col))
-            queue.append((row, col + 1))
-            queue.append((row, col - 1))
+class DiagonalFillTool(FillTool):
+    @property
+    def name(self) -> str:
+        return "Diagonal Fill"
+
+    @property
+    def description(self) -> str:
+        return "Fill closed area, spreading across corners too"
 
-        return self.board.draw(coords=coords)  # Draw all the cells
+    @property
+    def connectivity(self) -> Literal[4, 8]:
+        return 8
 
 
 class ReplaceTool(Tool):
@@ -241,11 +226,9 @@ class ReplaceTool(Tool):
     async def use(self, *, interaction: discord.Interaction) -> bool:
         """The method that is called when the tool is used"""
         colour = self.board.cursor
-        to_replace = self.board.cursor_pixel
+        to_replace = self.board.get_pixel_index()
 
-        return self.board.draw(
-            colour, coords=np.array(np.where(self.board.board == to_replace)).T
-        )
+        return self.board.draw(colour, coords=self.board.board == to_replace)
 
 
 CHANGE_AMOUNT = 17  # Change amount for Lighten & Darken tools to allow exactly 15 changes from 0 or 255, respectively
@@ -265,41 +248,79 @@ class DarkenTool(Tool):
         return "Darken pixel(s) by 17 RGB values"
 
     @staticmethod
-    def edit(value: int) -> int:
-        return max(
-            value - CHANGE_AMOUNT, 0
-        )  # The max func makes sure it doesn't go below 0 when decreasing, for example, black
+    def edit(values: np.ndarray) -> np.ndarray:
+        return np.maximum(
+            values - CHANGE_AMOUNT, 0
+        )  # Makes sure it doesn't go below 0 when decreasing, for example, black
+
+    async def colour_of(self, emoji: str) -> Optional[Colour]:
+        """The colour of an emoji, None if it has no visible colour, such as the transparent emoji"""
+
+        partial_emoji = discord.PartialEmoji.from_str(emoji)
+        if (
+            partial_emoji.id is not None
+            and (colour_emoji := self.bot.emoji_cache.get_emoji_from_id(partial_emoji.id))
+            is not None
+        ):
+            try:
+                return Colour.from_hex(colour_emoji.name)
+            except ValueError:  # It is not a colour emoji
+                pass
+
+        try:
+            return await Colour.from_emoji(emoji)
+        except ValueError:
+            return None
 
     async def use(self, *, interaction: discord.Interaction) -> bool:
         """The method that is called when the tool is used"""
-        cursors = self.board.cursor_coords
+        mask = self.board.cursor_mask
+        # Only the distinct colours of the selection are resolved, edited and uploaded
+        indices, inverse = np.unique(self.board.board[mask], return_inverse=True)
+        if indices.size == 0:
+            return False
+        emojis = [self.board.palette[index] for index in indices.tolist()]
 
-        for cursor in cursors:
-            emoji = discord.PartialEmoji.from_str(
-                self.board.un_cursor(self.board.board[cursor])
-            )
-            colour = None
-            if (fetched_emoji := self.bot.get_emoji(emoji.id)) is not None:
-                try:
-                    colour = Colour.from_hex(fetched_emoji.name)
-                except ValueError:  # It is not a colour emoji
-                    pass
+        colours = await asyncio.gather(*(self.colour_of(emoji) for emoji in emojis))
+        # Cells without a visible colour are left as they are
+        visible = [colour for colour in colours if colour is not None]
+        if not visible:
+            return False
+        RGBA = np.array([colour.RGBA for colour in visible], dtype=np.int16)
+        RGBA[:, :3] = self.edit(RGBA[:, :3])
+        edited = iter([Colour(tuple(rgba)) for rgba in RGBA.tolist()])
+        modified_colours = [
+            next(edited) if colour is not None else None for colour in colours
+        ]
+
+        uploaded = await self.bot.upload_emojis(
+            [colour for colour in modified_colours if colour is not None],
+            draw_view=self.view,
+            interaction=interaction,
+        )
 
+        failed = []
+        modified_emojis = []
+        for emoji, colour in zip(emojis, modified_colours):
             if colour is None:
-                colour = await Colour.from_emoji(str(emoji))
-
-            RGB_A = (
-                self.edit(colour.R),
-                self.edit(colour.G),
-                self.edit(colour.B),
-                colour.A,
+                modified_emojis.append(emoji)
+                continue
+            result = uploaded[colour.hex]
+            if isinstance(result, Exception):
+                failed.append(f"`{colour.hex}` ({result})")
+                # Leave the cells of this colour as they are
+                modified_emojis.append(emoji)
+            else:
+                modified_emojis.append(str(result))
+        if failed:
+            await self.view.create_notification(
+                f"Could not {self.name.lower()} some colours: {', '.join(failed)}",
+                emoji=discord.PartialEmoji.from_str(self.emoji),
             )
-            modified_colour = Colour(RGB_A)
 
-            modified_emoji = await self.bot.upload_emoji(
-                modified_colour, draw_view=self.view, interaction=interaction
-            )
-            return self.board.draw(str(modified_emoji), coords=[cursor])
+        return self.board.draw(
+            [modified_emojis[index] for index in inverse.tolist()], coords=mask
+        )
 
 
 class LightenTool(DarkenTool):
@@ -316,7 +337,7 @@ class LightenTool(DarkenTool):
         return "Lighten pixel(s) by 17 RGB values"
 
     @staticmethod
-    def edit(value: int) -> int:
-        return min(
-            value + CHANGE_AMOUNT, 255
-        )  # The min func makes sure it doesn't go above 255 when increasing, for example, white
+    def edit(values: np.ndarray) -> np.ndarray:
+        return np.minimum(
+            values + CHANGE_AMOUNT, 255
+        )  # Makes sure it doesn't go above 255 when increasing, for example, white
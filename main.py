@@ -12,7 +12,7 @@ import asyncio
 import datetime
 import logging
 from functools import cached_property
-from typing import Any, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import aiohttp
 import discord
@@ -23,6 +23,10 @@ from helpers.context import CustomContext
 from cogs.Draw.utils.colour import Colour
 from cogs.Draw.draw import DrawView
 from cogs.Draw.utils.emoji_cache import EmojiCache
+from cogs.Draw.utils.emoji_pool import EmojiPool
+from cogs.Draw.utils.message_dispatcher import MessageDispatcher
+from cogs.Draw.utils.sessions import SessionStore
+from cogs.Draw.utils.snapping import ColourSnapper, SnapMode
 from helpers.constants import (
     PY_BLOCK_FMT,
     EMBED_DESC_CHAR_LIMIT,
@@ -79,8 +83,10 @@ class Bot(commands.Bot):
         self.status = discord.Status.online
 
         self.emoji_cache: EmojiCache = EmojiCache(bot=self)
-
-        self.lock = asyncio.Lock()
+        self.emoji_pool: EmojiPool = EmojiPool(bot=self)
+        self.message_dispatcher: MessageDispatcher = MessageDispatcher()
+        self.colour_snapper: ColourSnapper = ColourSnapper(bot=self)
+        self.session_store: SessionStore = SessionStore()
 
     @cached_property
     def invite_url(self) -> str:
@@ -145,6 +151,9 @@ class Bot(commands.Bot):
         self.EMOJI_SERVERS = [
             await self.fetch_guild(_id) for _id in self.EMOJI_SERVER_IDS
         ]
+        await self.emoji_cache.populate(self.EMOJI_SERVERS)
+        self.emoji_pool.load()
+        await self.session_store.connect()
 
         self.status_channel = await self.fetch_channel(os.getenv("statusCHANNEL"))
         self.log_channel = await self.fetch_channel(os.getenv("logCHANNEL"))
@@ -185,6 +194,11 @@ class Bot(commands.Bot):
         await self.status_channel.send(f"```ansi\n{msg}\n```")
         log.info(msg)
 
+    async def close(self):
+        # Write the draw sessions changed since the last flush before exiting
+        await self.session_store.close()
+        await super().close()
+
     async def report_error(self, error: Exception, ctx: Optional[CustomContext] = None):
         tb = "".join(
             traceback.format_exception(type(error), error, error.__traceback__)
@@ -249,45 +263,60 @@ class Bot(commands.Bot):
 
             return self
 
+    async def on_guild_emojis_update(
+        self,
+        guild: discord.Guild,
+        before: Tuple[discord.Emoji, ...],
+        after: Tuple[discord.Emoji, ...],
+    ):
+        if guild.id in self.EMOJI_SERVER_IDS:
+            self.emoji_cache.set_guild_emojis(guild, after)
+
     async def upload_emoji(
         self, colour: Colour, *, draw_view: DrawView, interaction: discord.Interaction
     ) -> Union[discord.Emoji, discord.PartialEmoji]:
-        # First look if there is cache of the emoji
+        [colour] = self.colour_snapper.snap([colour], mode=draw_view.snapping)
+        # First look if the emoji already exists in one of the servers
         if (emoji := self.emoji_cache.get_emoji(colour.hex)) is not None:
             return emoji
 
         async with draw_view.disable(interaction=interaction):
-            # Look if emoji already exists in a server
-            guild_emoji_lists = []
-            for guild in self.EMOJI_SERVERS:
-                guild_emojis = await guild.fetch_emojis()
-                guild_emoji_lists.append(guild_emojis)
-                for guild_emoji in guild_emojis:
-                    if colour.hex == guild_emoji.name:
-                        self.emoji_cache.add_emoji(guild_emoji)
-                        return guild_emoji
-
-            # Emoji does not exist already, proceed to create
-            for guild in self.EMOJI_SERVERS:
-                try:
-                    emoji = await colour.to_emoji(guild)
-                except discord.HTTPException:
-                    continue
-                else:
-                    self.emoji_cache.add_emoji(emoji)
-                    return emoji
-            # If it exits without returning aka there was no space available
-            else:
-                emoji_to_delete = guild_emoji_lists[0][
-                    0
-                ]  # Get first emoji from the first emoji server
-                await emoji_to_delete.delete()  # Delete the emoji to make space for the new one
-                self.emoji_cache.remove_emoji(
-                    emoji_to_delete
-                )  # Delete that emoji from cache if it exists
-                return await self.upload_emoji(
-                    colour, draw_view=draw_view, interaction=interaction
-                )  # Run again
+            return await self.emoji_pool.create(colour)
+
+    async def upload_emojis(
+        self,
+        colours: List[Colour],
+        *,
+        draw_view: Optional[DrawView] = None,
+        interaction: Optional[discord.Interaction] = None,
+        snapping: Optional[SnapMode] = None,
+    ) -> Dict[str, Union[discord.Emoji, discord.PartialEmoji, Exception]]:
+        """Uploads multiple colours at once, returning the emoji or the error of each hex.
+        The results are keyed by the hex of the colours passed, even if they were snapped.
+
+        The colours are snapped with the draw view's snapping mode unless one is passed, or
+        not at all without either. The draw view, if any, is disabled while emojis are being created."""
+
+        if snapping is None:
+            snapping = draw_view.snapping if draw_view is not None else "off"
+        snapped = dict(
+            zip(
+                (colour.hex for colour in colours),
+                self.colour_snapper.snap(colours, mode=snapping),
+            )
+        )
+        if draw_view is None or all(
+            (
+                self.emoji_cache.get_emoji(colour.hex) is not None
+                for colour in snapped.values()
+            )
+        ):
+            uploaded = await self.emoji_pool.upload(snapped.values())
+        else:
+            async with draw_view.disable(interaction=interaction):
+                uploaded = await self.emoji_pool.upload(snapped.values())
+
+        return {hex: uploaded[colour.hex] for hex, colour in snapped.items()}
 
 
 TOKEN = os.getenv("botTOKEN")
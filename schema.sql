@@ -0,0 +1,19 @@
+-- Draw sessions, written by cogs/Draw/utils/sessions.py for `draw resume`
+CREATE TABLE IF NOT EXISTS draw_sessions (
+    message_id BIGINT PRIMARY KEY,
+    channel_id BIGINT NOT NULL,
+    author_id BIGINT NOT NULL,
+    background TEXT NOT NULL,
+    palette TEXT[] NOT NULL,
+    history BYTEA NOT NULL,
+    cursor TEXT NOT NULL,
+    cursor_row INTEGER NOT NULL,
+    cursor_col INTEGER NOT NULL,
+    tool TEXT NOT NULL,
+    snapping TEXT NOT NULL,
+    image_mode BOOLEAN NOT NULL,
+    colour_options TEXT[] NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS draw_sessions_author_idx ON draw_sessions (author_id, updated_at DESC);